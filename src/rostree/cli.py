@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import shutil
 import subprocess
@@ -16,6 +17,29 @@ from rostree.core.finder import (
 )
 from rostree.core.tree import build_dependency_tree, DependencyNode
 
+try:
+    import orjson
+except ImportError:  # Optional speedup for --json output (pip install rostree[fast])
+    orjson = None
+
+
+def _json_dumps(obj: object) -> bytes:
+    """Serialize obj as 2-space indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+
+
+def _print_json(obj: object) -> None:
+    """Write obj to stdout as JSON bytes, so non-ASCII text works whatever its encoding."""
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:  # a text-only stream (e.g. io.StringIO) has no byte layer
+        print(_json_dumps(obj).decode())
+        return
+    sys.stdout.flush()
+    buffer.write(_json_dumps(obj) + b"\n")
+    buffer.flush()
+
 
 def _print_tree_text(node: DependencyNode, indent: int = 0, prefix: str = "") -> None:
     """Print a dependency tree as indented text."""
@@ -48,7 +72,7 @@ def cmd_scan(args: argparse.Namespace) -> int:
     )
 
     if args.json:
-        print(json.dumps([ws.to_dict() for ws in workspaces], indent=2))
+        _print_json([ws.to_dict() for ws in workspaces])
     else:
         if not workspaces:
             print("No ROS 2 workspaces found.")
@@ -82,7 +106,7 @@ def cmd_list(args: argparse.Namespace) -> int:
     if args.by_source:
         by_source = list_packages_by_source(extra_source_roots=extra_roots)
         if args.json:
-            print(json.dumps(by_source, indent=2))
+            _print_json(by_source)
         else:
             if not by_source:
                 print("No packages found. Is your ROS 2 environment sourced?")
@@ -100,7 +124,7 @@ def cmd_list(args: argparse.Namespace) -> int:
     else:
         packages = list_package_paths(extra_source_roots=extra_roots)
         if args.json:
-            print(json.dumps({name: str(path) for name, path in packages.items()}, indent=2))
+            _print_json({name: str(path) for name, path in packages.items()})
         else:
             if not packages:
                 print("No packages found. Is your ROS 2 environment sourced?")
@@ -130,7 +154,7 @@ def cmd_tree(args: argparse.Namespace) -> int:
         return 1
 
     if args.json:
-        print(json.dumps(tree.to_dict(), indent=2))
+        _print_json(tree.to_dict())
     else:
         _print_tree_text(tree)
     return 0
@@ -181,33 +205,55 @@ def _collect_edges_multi(
     return edges, all_nodes
 
 
+def _graph_edges(roots: list[DependencyNode]) -> set[tuple[str, str]]:
+    """Collect the deduplicated edge set of all trees (shared by every output backend)."""
+    edges: set[tuple[str, str]] = set()
+    for root in roots:
+        _collect_edges(root, edges)
+    return edges
+
+
+def _edges_to_adjacency(edges: set[tuple[str, str]]) -> dict[str, list[str]]:
+    """Group edges into a parent -> children adjacency dict with interned node names."""
+    adj: dict[str, list[str]] = {}
+    for parent, child in sorted(edges):
+        adj.setdefault(sys.intern(parent), []).append(sys.intern(child))
+    return adj
+
+
+# Fixed DOT graph attributes emitted after the optional title
+_DOT_PREAMBLE = (
+    "    rankdir=LR;",
+    '    node [shape=box, style=rounded, fontname="sans-serif"];',
+)
+
+
 def _generate_dot(
     roots: list[DependencyNode],
     title: str | None = None,
     highlight_roots: bool = True,
+    edges: set[tuple[str, str]] | None = None,
 ) -> str:
-    """Generate DOT (Graphviz) format from dependency trees."""
+    """Generate DOT (Graphviz) format from dependency trees (or precomputed edges)."""
     root_names = {r.name for r in roots}
-    edges: set[tuple[str, str]] = set()
-    for root in roots:
-        _collect_edges(root, edges)
+    if edges is None:
+        edges = _graph_edges(roots)
 
-    lines = [
-        "digraph dependencies {",
-        "    rankdir=LR;",
-        '    node [shape=box, style=rounded, fontname="sans-serif"];',
-    ]
+    # Build the output as a list of lines joined once at the end (linear in graph size).
+    lines = ["digraph dependencies {"]
     if title:
-        lines.insert(1, f'    label="{title}";')
-        lines.insert(2, "    labelloc=t;")
+        lines.append(f'    label="{title}";')
+        lines.append("    labelloc=t;")
+    lines.extend(_DOT_PREAMBLE)
 
     # Highlight root nodes
     if highlight_roots:
-        for name in sorted(root_names):
-            lines.append(f'    "{name}" [style="rounded,filled", fillcolor=lightblue];')
+        lines.extend(
+            f'    "{name}" [style="rounded,filled", fillcolor=lightblue];'
+            for name in sorted(root_names)
+        )
 
-    for parent, child in sorted(edges):
-        lines.append(f'    "{parent}" -> "{child}";')
+    lines.extend(f'    "{parent}" -> "{child}";' for parent, child in sorted(edges))
 
     lines.append("}")
     return "\n".join(lines)
@@ -217,25 +263,28 @@ def _generate_mermaid(
     roots: list[DependencyNode],
     title: str | None = None,
     highlight_roots: bool = True,
+    edges: set[tuple[str, str]] | None = None,
 ) -> str:
-    """Generate Mermaid format from dependency trees."""
+    """Generate Mermaid format from dependency trees (or precomputed edges)."""
     root_names = {r.name for r in roots}
-    edges: set[tuple[str, str]] = set()
-    for root in roots:
-        _collect_edges(root, edges)
+    if edges is None:
+        edges = _graph_edges(roots)
 
-    lines = ["graph LR"]
+    lines: list[str] = []
     if title:
-        lines[0] = f"---\ntitle: {title}\n---\ngraph LR"
+        lines.extend(("---", f"title: {title}", "---"))
+    lines.append("graph LR")
 
     # Style root nodes
     if highlight_roots:
         for name in sorted(root_names):
-            lines.append(f"    {_mermaid_id(name)}[{name}]")
-            lines.append(f"    style {_mermaid_id(name)} fill:#lightblue")
+            node_id = _mermaid_id(name)
+            lines.append(f"    {node_id}[{name}]")
+            lines.append(f"    style {node_id} fill:#lightblue")
 
-    for parent, child in sorted(edges):
-        lines.append(f"    {_mermaid_id(parent)} --> {_mermaid_id(child)}")
+    lines.extend(
+        f"    {_mermaid_id(parent)} --> {_mermaid_id(child)}" for parent, child in sorted(edges)
+    )
 
     return "\n".join(lines)
 
@@ -273,13 +322,15 @@ GRAPH_DEFAULT_DEPTH = 4
 GRAPH_MAX_PACKAGES = 50
 
 
+@functools.lru_cache(maxsize=1)
 def _check_graphviz() -> bool:
-    """Check if Graphviz (dot) is available."""
+    """Check if Graphviz (dot) is available. Cached for the life of the process."""
     return shutil.which("dot") is not None
 
 
+@functools.lru_cache(maxsize=1)
 def _check_matplotlib() -> bool:
-    """Check if matplotlib and networkx are available."""
+    """Check if matplotlib and networkx are available. Cached for the life of the process."""
     try:
         import matplotlib  # noqa: F401
         import networkx  # noqa: F401
@@ -289,16 +340,37 @@ def _check_matplotlib() -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=1)
+def _load_pyplot():
+    """Import pyplot on the non-interactive Agg backend (files only, no GUI probing)."""
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
 def _render_with_matplotlib(
-    edges: set[tuple[str, str]],
+    edges: dict[str, list[str]] | set[tuple[str, str]],
     root_names: set[str],
     output_path: Path,
     format: str,
     title: str | None = None,
 ) -> bool:
-    """Render graph using matplotlib and networkx (pure Python, no system deps)."""
+    """
+    Render graph using matplotlib and networkx (pure Python, no system deps).
+
+    edges may be a parent -> children adjacency dict (see _edges_to_adjacency)
+    or a plain set of (parent, child) tuples.
+    """
+    # Check for an empty graph before paying for the matplotlib/networkx imports
+    if not edges and not root_names:
+        print("Error: Graph is empty", file=sys.stderr)
+        return False
+
     try:
-        import matplotlib.pyplot as plt
+        plt = _load_pyplot()
         import networkx as nx
     except ImportError:
         print(
@@ -312,17 +384,16 @@ def _render_with_matplotlib(
     try:
         # Create directed graph
         G = nx.DiGraph()
-        G.add_edges_from(edges)
+        if isinstance(edges, dict):
+            G.add_edges_from((parent, child) for parent, kids in edges.items() for child in kids)
+        else:
+            G.add_edges_from(edges)
 
         # Add isolated root nodes (roots with no deps)
         for root in root_names:
             if root not in G:
                 G.add_node(root)
 
-        if len(G.nodes()) == 0:
-            print("Error: Graph is empty", file=sys.stderr)
-            return False
-
         # Create figure
         fig_width = max(12, len(G.nodes()) * 0.5)
         fig_height = max(8, len(G.nodes()) * 0.3)
@@ -401,7 +472,9 @@ def _render_dot(dot_content: str, output_path: Path, format: str) -> bool:
         result = subprocess.run(
             ["dot", f"-T{format}", "-o", str(output_path)],
             input=dot_content,
-            capture_output=True,
+            # dot writes the image via -o; only stderr is needed for error reporting
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             text=True,
             timeout=60,
         )
@@ -505,10 +578,13 @@ def cmd_graph(args: argparse.Namespace) -> int:
     else:
         title = "Workspace dependencies"
 
+    # Collect edges once; text generation and the matplotlib fallback both reuse them
+    root_names = {t.name for t in trees}
+    edges = _graph_edges(trees)
     if args.format == "mermaid":
-        output = _generate_mermaid(trees, title=title)
+        output = _generate_mermaid(trees, title=title, edges=edges)
     else:  # dot
-        output = _generate_dot(trees, title=title)
+        output = _generate_dot(trees, title=title, edges=edges)
 
     # Handle rendering to image
     render_format = getattr(args, "render", None)
@@ -544,16 +620,10 @@ def cmd_graph(args: argparse.Namespace) -> int:
         if _check_graphviz():
             rendered = _render_dot(output, out_path, render_format)
         else:
-            # Collect edges for matplotlib rendering
-            root_names = {t.name for t in trees}
-            edges: set[tuple[str, str]] = set()
-            for tree in trees:
-                _collect_edges(tree, edges)
-
             if _check_matplotlib():
                 print("Graphviz not found, using matplotlib...", file=sys.stderr)
                 rendered = _render_with_matplotlib(
-                    edges, root_names, out_path, render_format, title
+                    _edges_to_adjacency(edges), root_names, out_path, render_format, title
                 )
             else:
                 print(
@@ -586,8 +656,8 @@ def cmd_graph(args: argparse.Namespace) -> int:
     return 0
 
 
-def main(argv: list[str] | None = None) -> int:
-    """Main entry point for the rostree CLI."""
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the rostree CLI (all subcommands included)."""
     parser = argparse.ArgumentParser(
         prog="rostree",
         description="Explore ROS 2 package dependencies from the command line.",
@@ -792,7 +862,18 @@ def main(argv: list[str] | None = None) -> int:
     )
     tui_parser.set_defaults(func=cmd_tui)
 
-    args = parser.parse_args(argv)
+    return parser
+
+
+@functools.lru_cache(maxsize=1)
+def _get_parser() -> argparse.ArgumentParser:
+    """Return the CLI parser shared by every main() call in this process."""
+    return build_parser()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Main entry point for the rostree CLI."""
+    args = _get_parser().parse_args(argv)
 
     # Default to TUI if no command specified
     if args.command is None:
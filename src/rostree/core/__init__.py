@@ -4,6 +4,7 @@ from rostree.core.finder import (
     find_package_path,
     list_package_paths,
     list_packages_by_source,
+    package_resolver,
     scan_for_workspaces,
     WorkspaceInfo,
 )
@@ -14,6 +15,7 @@ __all__ = [
     "find_package_path",
     "list_package_paths",
     "list_packages_by_source",
+    "package_resolver",
     "scan_for_workspaces",
     "WorkspaceInfo",
     "parse_package_xml",
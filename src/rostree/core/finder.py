@@ -2,12 +2,27 @@
 
 from __future__ import annotations
 
+import functools
+import mmap
 import os
+import re
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
 
+try:
+    from lxml import etree as ET
+except ImportError:  # the [fast] extra; only the parser fallback of name reads uses it
+    import xml.etree.ElementTree as ET
 
-@dataclass
+# Upper bound on threads used to read package.xml files during discovery.
+_MAX_READ_WORKERS = min(8, os.cpu_count() or 1)
+
+
+@dataclass(slots=True)
 class WorkspaceInfo:
     """Information about a discovered ROS 2 workspace."""
 
@@ -72,168 +87,416 @@ def scan_for_workspaces(
                     if distro.is_dir():
                         roots.append(distro)
 
+    return _scan_roots(roots, max_depth)
+
+
+def clear_prefix_cache() -> None:
+    """Forget memoized install-prefix lookups (e.g. after re-pointing a symlinked prefix)."""
+    _is_system_prefix_str.cache_clear()
+    _workspace_root_from_prefix_str.cache_clear()
+
+
+# Directory names never descended into while scanning: colcon artifacts outside a workspace
+# root and common heavy trees that cannot contain one. Hidden directories are skipped too.
+_PRUNE_DIRS = frozenset({"node_modules", "build", "install", "log", "__pycache__"})
+
+
+def _scan_roots(roots: list[Path], max_depth: int) -> list[WorkspaceInfo]:
+    """
+    Walk roots (up to max_depth) and return the workspaces found.
+
+    The walk works on path strings; Path objects are only built for the workspaces it
+    reports.
+    """
     workspaces: list[WorkspaceInfo] = []
-    seen: set[Path] = set()
+    seen: set[str] = set()
 
-    def _is_workspace(p: Path) -> WorkspaceInfo | None:
-        """Check if path is a ROS 2 workspace root."""
-        resolved = p.resolve()
-        if resolved in seen:
+    def _list_dir(p: str) -> dict[str, os.DirEntry[str]] | None:
+        """One scandir per candidate; its entries serve both marker checks and descent."""
+        try:
+            with os.scandir(p) as it:
+                return {entry.name: entry for entry in it}
+        except OSError:
             return None
-        has_src = (p / "src").exists() and (p / "src").is_dir()
-        has_install = (p / "install").exists() and (p / "install").is_dir()
-        has_build = (p / "build").exists() and (p / "build").is_dir()
+
+    def _has_dir(entries: dict[str, os.DirEntry[str]], name: str) -> bool:
+        entry = entries.get(name)
+        try:
+            return entry is not None and entry.is_dir()
+        except OSError:
+            return False
+
+    def _is_workspace(p: str, entries: dict[str, os.DirEntry[str]]) -> WorkspaceInfo | None:
+        """Check if path (already canonical, listed as entries) is a ROS 2 workspace root."""
+        has_src = _has_dir(entries, "src")
+        has_install = _has_dir(entries, "install")
+        has_build = _has_dir(entries, "build")
         # For /opt/ros distros, check share dir
-        has_share = (p / "share").exists() and (p / "share").is_dir()
+        has_share = _has_dir(entries, "share")
         if has_src or has_install or has_share:
-            seen.add(resolved)
+            seen.add(p)
+            path = Path(p)
             info = WorkspaceInfo(
-                path=resolved,
+                path=path,
                 has_src=has_src,
                 has_install=has_install or has_share,
                 has_build=has_build,
             )
             # Discover packages
             if has_src:
-                info.packages = _list_packages_in_src(p / "src")
+                info.packages = _list_packages_in_src(path / "src")
             elif has_install:
-                info.packages = _list_packages_in_install(p / "install")
+                info.packages = _list_packages_in_install(path / "install")
             elif has_share:
-                info.packages = _list_packages_in_install(p)
+                info.packages = _list_packages_in_install(path)
             return info
         return None
 
-    def _scan_dir(p: Path, depth: int) -> None:
-        if depth > max_depth:
+    def _scan_dir(p: str, depth: int) -> None:
+        if depth > max_depth or p in seen:
             return
-        if not p.exists() or not p.is_dir():
+        entries = _list_dir(p)
+        if entries is None:
             return
-        try:
-            ws = _is_workspace(p)
-            if ws is not None:
-                workspaces.append(ws)
-                return  # Don't recurse into a workspace
-            for child in p.iterdir():
-                if child.is_dir() and not child.name.startswith("."):
-                    _scan_dir(child, depth + 1)
-        except PermissionError:
-            pass
+        ws = _is_workspace(p, entries)
+        if ws is not None:
+            workspaces.append(ws)
+            return  # Don't recurse into a workspace
+        # p is canonical, so only symlinked children need resolving to stay canonical
+        children = []
+        for name, entry in entries.items():
+            if name[:1] == "." or name in _PRUNE_DIRS:
+                continue
+            try:
+                if not entry.is_dir():
+                    continue
+                children.append(os.path.realpath(entry.path) if entry.is_symlink() else entry.path)
+            except OSError:
+                continue
+        for child in children:
+            _scan_dir(child, depth + 1)
 
     for root in roots:
-        root_path = Path(root).resolve()
-        if root_path.exists():
-            # Check if root itself is a workspace
-            ws = _is_workspace(root_path)
-            if ws is not None:
-                workspaces.append(ws)
-            else:
-                _scan_dir(root_path, 0)
+        root_path = os.path.realpath(root)
+        if os.path.exists(root_path):
+            # Check if root itself is a workspace, otherwise walk it
+            _scan_dir(root_path, 0)
 
     return workspaces
 
 
+# <name> as the first child of <package> (the order REP 149 requires), after an optional
+# XML declaration, processing instructions and comments. Matching this in the file head
+# avoids running a parser at all for conforming manifests. Comment and PI bodies cannot
+# run past their own terminator: a match never spans into later markup, and there is
+# only one way to split the prefix, so a failed match does not backtrack exponentially.
+_HEAD_NAME_RE = re.compile(
+    rb"\A\s*(?:<\?(?:(?!\?>).)*\?>\s*|<!--(?:(?!-->).)*-->\s*)*"
+    rb"<package\b[^>]*>\s*(?:<!--(?:(?!-->).)*-->\s*)*"
+    rb"<name>\s*([^<&\s][^<&]*?)\s*</name>",
+    re.DOTALL,
+)
+_HEAD_BYTES = 4096
+
+
+class _NameTarget:
+    """Parser target that keeps only the text of the top-level <name>; builds no elements."""
+
+    __slots__ = ("depth", "parts", "done", "name")
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.parts: list[str] = []
+        self.done = False
+        self.name: str | None = None
+
+    def start(self, tag: str, attrib: dict[str, str]) -> None:
+        self.depth += 1
+        if self.depth == 2:
+            # Text is only kept for the current child of the root element
+            self.parts.clear()
+
+    def end(self, tag: str) -> None:
+        self.depth -= 1
+        if self.depth == 1 and tag == "name" and not self.done:
+            self.done = True
+            self.name = "".join(self.parts).strip() or None
+
+    def data(self, text: str) -> None:
+        if self.depth == 2 and not self.done:
+            self.parts.append(text)
+
+    def close(self) -> str | None:
+        return self.name
+
+
+def _read_package_name(pkg_xml: str | Path, expected: str | None = None) -> str | None:
+    """
+    Return the top-level <name> of a package.xml, or None if missing or unreadable.
+
+    Conforming manifests are answered from a regex match on the first few KiB (or on an
+    mmap of the file when it is larger). Anything else is fed to a parser with a
+    _NameTarget, stopping as soon as the top-level </name> closes.
+
+    With ``expected``, a file whose bytes never contain that name (and no entity that
+    could spell it) returns None without being matched or parsed.
+    """
+    needle = expected.encode() if expected is not None else None
+    try:
+        with open(pkg_xml, "rb") as f:
+            head = f.read(_HEAD_BYTES)
+            if needle is not None and len(head) < _HEAD_BYTES:
+                if needle not in head and b"&" not in head:
+                    return None
+            match = _HEAD_NAME_RE.match(head)
+            if match is None and len(head) == _HEAD_BYTES:
+                # Larger file (e.g. a long license comment first): match the same pattern
+                # over a read-only mapping instead of copying the whole file into memory
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if needle is not None and mm.find(needle) < 0 and mm.find(b"&") < 0:
+                        return None
+                    match = _HEAD_NAME_RE.match(mm)
+                    name = match.group(1) if match else None
+                if name is not None:
+                    return name.decode()
+            elif match:
+                return match.group(1).decode()
+            # Push the file through a target parser in chunks (the head first), so no
+            # elements are built and reading stops once the top-level </name> closes
+            target = _NameTarget()
+            parser = ET.XMLParser(target=target)
+            chunk = head
+            while chunk and not target.done:
+                try:
+                    parser.feed(chunk)
+                except ET.ParseError:
+                    # Malformed content after the name does not matter
+                    if not target.done:
+                        raise
+                chunk = f.read(_HEAD_BYTES)
+            if not target.done:
+                parser.close()
+            return target.name
+    except (ET.ParseError, OSError, UnicodeDecodeError):
+        pass
+    return None
+
+
+# Directories never searched for packages: colcon's build/install/log output and VCS or
+# tool metadata. Hidden directories are skipped too.
+_SRC_PRUNE_DIRS = frozenset({"build", "install", "log", "__pycache__"})
+# A directory holding any of these files is ignored together with everything below it.
+_IGNORE_MARKERS = ("COLCON_IGNORE", "AMENT_IGNORE", "CATKIN_IGNORE")
+
+
+def _iter_manifests(src: Path) -> Iterator[str]:
+    """
+    Yield the path string of every package.xml under src lazily, depth-first.
+
+    Follows colcon's discovery rules: a directory with a package.xml is a package and is
+    not searched further, and directories marked with an ignore file are skipped. Each
+    directory is listed once with os.scandir; the listing answers the package.xml and
+    ignore-marker checks and the directory types, so traversal needs no extra stat calls.
+    """
+    stack = [os.fspath(src)]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        names = {entry.name for entry in entries}
+        if any(marker in names for marker in _IGNORE_MARKERS):
+            continue
+        if "package.xml" in names:
+            yield os.path.join(d, "package.xml")
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.name[:1] == "." or entry.name in _SRC_PRUNE_DIRS:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+            except OSError:
+                continue
+        # Reversed so the stack pops them in listing order, like os.walk's pre-order
+        stack.extend(reversed(subdirs))
+
+
+def _manifest_paths(src: Path) -> list[Path]:
+    """Return every package.xml under src, in _iter_manifests order."""
+    return [Path(p) for p in _iter_manifests(src)]
+
+
+def _package_names_in_trees(srcs: list[Path]) -> list[list[tuple[str, Path]]]:
+    """
+    Return, for each tree in srcs, (name, package.xml path) for every package under it.
+
+    The trees are walked concurrently and every package.xml is then read through one
+    shared pool (directory listing and file reads both release the GIL). Each tree's
+    result keeps walk order, so callers resolving duplicates stay deterministic.
+    """
+    if len(srcs) > 1:
+        with ThreadPoolExecutor(max_workers=min(_MAX_READ_WORKERS, len(srcs))) as pool:
+            per_tree = list(pool.map(_manifest_paths, srcs))
+    else:
+        per_tree = [_manifest_paths(src) for src in srcs]
+    paths = [pkg_xml for tree in per_tree for pkg_xml in tree]
+    if len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=min(_MAX_READ_WORKERS, len(paths))) as pool:
+            names = iter(list(pool.map(_read_package_name, paths)))
+    else:
+        names = iter([_read_package_name(pkg_xml) for pkg_xml in paths])
+    results = []
+    for tree in per_tree:
+        # tree first: zip stops on it without pulling an extra name
+        results.append([(name, pkg_xml) for pkg_xml, name in zip(tree, names) if name])
+    return results
+
+
+def _package_names_in_tree(src: Path) -> list[tuple[str, Path]]:
+    """Return (name, package.xml path) for every package under src, in walk order."""
+    return _package_names_in_trees([src])[0]
+
+
 def _list_packages_in_src(src: Path) -> list[str]:
     """List package names from a src directory."""
-    packages = []
-    for root, _dirs, files in os.walk(src):
-        if "package.xml" not in files:
-            continue
-        pkg_xml = Path(root) / "package.xml"
+    return sorted({name for name, _pkg_xml in _package_names_in_tree(src)})
+
+
+# Stat package.xml relative to an open share/ descriptor where the platform allows it
+_USE_DIR_FD = os.stat in os.supports_dir_fd and os.scandir in os.supports_fd
+
+
+def _share_package_names(share: Path) -> list[str]:
+    """
+    Return the names of the entries of share that are package directories (contain a
+    package.xml), in directory order.
+
+    share is opened once and each <name>/package.xml is stat'ed relative to that
+    descriptor, so the share path itself is not re-resolved for every candidate.
+    """
+    if not _USE_DIR_FD:
         try:
-            with open(pkg_xml) as f:
-                for line in f:
-                    if "<name>" in line and "</name>" in line:
-                        start = line.find("<name>") + 6
-                        end = line.find("</name>")
-                        name = line[start:end].strip()
-                        if name:
-                            packages.append(name)
-                        break
+            with os.scandir(share) as it:
+                return [
+                    entry.name
+                    for entry in it
+                    if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "package.xml"))
+                ]
         except OSError:
-            continue
-    return sorted(set(packages))
+            return []
+    try:
+        dfd = os.open(share, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return []
+    try:
+        with os.scandir(dfd) as it:
+            candidates = [entry.name for entry in it if entry.is_dir()]
+        names = []
+        for name in candidates:
+            try:
+                st = os.stat(f"{name}/package.xml", dir_fd=dfd)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                names.append(name)
+        return names
+    except OSError:
+        return []
+    finally:
+        os.close(dfd)
 
 
 def _list_packages_in_install(install: Path) -> list[str]:
     """List package names from an install or share directory."""
-    packages = []
-    share = install / "share" if (install / "share").exists() else install
-    if not share.exists():
-        return packages
-    try:
-        for child in share.iterdir():
-            if child.is_dir() and (child / "package.xml").exists():
-                packages.append(child.name)
-    except PermissionError:
-        pass
-    return sorted(packages)
+    share = install / "share"
+    if not share.is_dir():
+        share = install
+    return sorted(_share_package_names(share))
 
 
 def _env_paths(env_var: str) -> list[Path]:
     """Split an environment variable by os.pathsep and return existing Paths."""
-    value = os.environ.get(env_var, "")
+    return _paths_from_env_value(os.environ.get(env_var, ""))
+
+
+def _paths_from_env_value(value: str) -> list[Path]:
+    """Split an os.pathsep-separated value and return the existing directories as Paths."""
     if not value:
         return []
-    return [Path(p).resolve() for p in value.split(os.pathsep) if p.strip() and Path(p).exists()]
+    # os.path on plain strings; Path objects are only built for the entries kept
+    return [
+        Path(os.path.realpath(p)) for p in value.split(os.pathsep) if p.strip() and os.path.isdir(p)
+    ]
+
+
+def _prefix_paths() -> dict[str, list[Path]]:
+    """Read AMENT_PREFIX_PATH and COLCON_PREFIX_PATH once, for callers that need both twice."""
+    return {env: _env_paths(env) for env in ("AMENT_PREFIX_PATH", "COLCON_PREFIX_PATH")}
 
 
 def _find_package_xml_in_prefix(prefix: Path, package_name: str) -> Path | None:
     """Look for share/<package_name>/package.xml under a colcon/ament prefix."""
-    candidate = prefix / "share" / package_name / "package.xml"
-    if candidate.exists():
-        return candidate
+    candidate = os.path.join(prefix, "share", package_name, "package.xml")
+    if os.path.isfile(candidate):
+        return Path(candidate)
     # Some layouts use lib/python3.x/site-packages for ament_python
     return None
 
 
 def _find_package_xml_in_src(src_root: Path, package_name: str) -> Path | None:
     """Recursively search for a directory containing package.xml with matching <name>."""
-    for root, _dirs, files in os.walk(src_root, topdown=True):
-        if "package.xml" not in files:
-            continue
-        pkg_xml = Path(root) / "package.xml"
-        try:
-            with open(pkg_xml) as f:
-                for line in f:
-                    if "<name>" in line and f"<name>{package_name}</name>" in line:
-                        return pkg_xml
-                    # Simple line-based check; parser will validate
-                    if "<name>" in line:
-                        break
-        except OSError:
-            continue
+    # Same lazy walk as listing; the walk stops at the first matching manifest, and only
+    # that one is turned into a Path. Manifests that never mention the name are skipped
+    # after a byte search, without matching or parsing them.
+    for pkg_xml in _iter_manifests(src_root):
+        if _read_package_name(pkg_xml, package_name) == package_name:
+            return Path(pkg_xml)
     return None
 
 
-def _gather_workspace_src_roots(extra_source_roots: list[Path] | None = None) -> list[Path]:
-    """Collect workspace src roots from env and optional extra roots. Deduplicated."""
-    workspace_srcs: list[Path] = []
+def _install_prefixes(prefixes: dict[str, list[Path]]) -> list[Path]:
+    """
+    AMENT_PREFIX_PATH then COLCON_PREFIX_PATH entries, each prefix once.
+
+    Sourcing a colcon workspace puts the same install dirs in both variables. For
+    first-hit-wins lookups, probing a prefix again can never find anything new.
+    """
+    return list(dict.fromkeys(prefixes["AMENT_PREFIX_PATH"] + prefixes["COLCON_PREFIX_PATH"]))
+
+
+def _gather_workspace_src_roots(
+    extra_source_roots: list[Path] | None = None,
+    prefixes: dict[str, list[Path]] | None = None,
+) -> list[Path]:
+    """
+    Collect workspace src roots from env and optional extra roots. Deduplicated.
+
+    prefixes: result of _prefix_paths() if the caller already read it.
+    """
+    if prefixes is None:
+        prefixes = _prefix_paths()
+    workspace_srcs: list[str] = []
     for env in ("COLCON_PREFIX_PATH", "AMENT_PREFIX_PATH"):
-        for prefix in _env_paths(env):
+        for prefix in prefixes[env]:
             parent = prefix.parent
             if parent.name == "install":
-                src = parent / "src"
-                if src.exists() and src.is_dir():
+                src = os.path.join(parent, "src")
+                if os.path.isdir(src):
                     workspace_srcs.append(src)
     for env in ("ROS2_WORKSPACE", "COLCON_WORKSPACE"):
         for raw in os.environ.get(env, "").split(os.pathsep):
-            p = Path(raw).resolve()
-            if p.exists():
-                workspace_srcs.append(p / "src" if (p / "src").exists() else p)
+            p = os.path.abspath(raw)
+            if os.path.exists(p):
+                src = os.path.join(p, "src")
+                workspace_srcs.append(src if os.path.exists(src) else p)
     if extra_source_roots:
-        for p in extra_source_roots:
-            r = Path(p).resolve()
-            if r.exists() and r.is_dir():
-                workspace_srcs.append(r)
-    seen: set[Path] = set()
-    out: list[Path] = []
-    for src in workspace_srcs:
-        canonical = src.resolve()
-        if canonical in seen:
-            continue
-        seen.add(canonical)
-        out.append(canonical)
-    return out
+        workspace_srcs.extend(str(p) for p in extra_source_roots if os.path.isdir(p))
+    # Canonicalize each candidate once; dict keys keep first-seen order
+    return [Path(p) for p in dict.fromkeys(os.path.realpath(src) for src in workspace_srcs)]
 
 
 def find_package_path(
@@ -254,12 +517,13 @@ def find_package_path(
     Returns the path to the package.xml file, or None if not found.
     """
     # Install space: AMENT_PREFIX_PATH and COLCON_PREFIX_PATH
-    for prefix in _env_paths("AMENT_PREFIX_PATH") + _env_paths("COLCON_PREFIX_PATH"):
+    prefixes = _prefix_paths()
+    for prefix in _install_prefixes(prefixes):
         p = _find_package_xml_in_prefix(prefix, package_name)
         if p is not None:
             return p
 
-    workspace_srcs = _gather_workspace_src_roots(extra_source_roots=extra_source_roots)
+    workspace_srcs = _gather_workspace_src_roots(extra_source_roots, prefixes)
     for src in workspace_srcs:
         p = _find_package_xml_in_src(src, package_name)
         if p is not None:
@@ -268,6 +532,41 @@ def find_package_path(
     return None
 
 
+def package_resolver(
+    extra_source_roots: list[Path] | None = None,
+) -> Callable[[str], Path | None]:
+    """
+    Return a function answering find_package_path lookups for many names at once.
+
+    The environment is read once. Install prefixes are probed per name (one stat each).
+    The source roots are walked only once, on the first lookup that needs them, and turned
+    into a name -> package.xml index. Lookup order and first-hit rules match
+    find_package_path. The returned function is safe to call from several threads.
+    """
+    prefixes = _prefix_paths()
+    install = _install_prefixes(prefixes)
+    src_index: dict[str, Path] | None = None
+    lock = threading.Lock()
+
+    def resolve(package_name: str) -> Path | None:
+        nonlocal src_index
+        for prefix in install:
+            p = _find_package_xml_in_prefix(prefix, package_name)
+            if p is not None:
+                return p
+        with lock:
+            if src_index is None:
+                index: dict[str, Path] = {}
+                roots = _gather_workspace_src_roots(extra_source_roots, prefixes)
+                for packages in _package_names_in_trees(roots):
+                    for name, pkg_xml in packages:
+                        index.setdefault(name, pkg_xml)
+                src_index = index
+        return src_index.get(package_name)
+
+    return resolve
+
+
 def list_package_paths(
     *,
     extra_source_roots: list[Path] | None = None,
@@ -282,59 +581,70 @@ def list_package_paths(
     result: dict[str, Path] = {}
 
     # From install space: each prefix/share/<name>/package.xml
-    for prefix in _env_paths("AMENT_PREFIX_PATH") + _env_paths("COLCON_PREFIX_PATH"):
+    # Every occurrence is visited: a later prefix overrides an earlier one here
+    prefixes = _prefix_paths()
+    for prefix in prefixes["AMENT_PREFIX_PATH"] + prefixes["COLCON_PREFIX_PATH"]:
         share = prefix / "share"
         if not share.exists():
             continue
-        for child in share.iterdir():
-            if child.is_dir():
-                pkg_xml = child / "package.xml"
-                if pkg_xml.exists():
-                    result[child.name] = pkg_xml
+        for name in _share_package_names(share):
+            result[name] = share / name / "package.xml"
 
-    workspace_srcs = _gather_workspace_src_roots(extra_source_roots=extra_source_roots)
-    for src in workspace_srcs:
-        for root, _dirs, files in os.walk(src):
-            if "package.xml" not in files:
-                continue
-            pkg_xml = Path(root) / "package.xml"
-            try:
-                with open(pkg_xml) as f:
-                    for line in f:
-                        if "<name>" in line and "</name>" in line:
-                            start = line.find("<name>") + 6
-                            end = line.find("</name>")
-                            name = line[start:end].strip()
-                            if name and name not in result:
-                                result[name] = pkg_xml
-                            break
-            except OSError:
-                continue
+    workspace_srcs = _gather_workspace_src_roots(extra_source_roots, prefixes)
+    for packages in _package_names_in_trees(workspace_srcs):
+        for name, pkg_xml in packages:
+            if name not in result:
+                result[name] = pkg_xml
 
     return result
 
 
+# Roots of ROS distro installs; each ends in a separator so "/opt/rosetta" does not match.
+_SYSTEM_PREFIXES = ("/opt/ros/",)
+
+
 def _is_system_prefix(prefix: Path) -> bool:
     """True if prefix is under /opt/ros (ROS distro install)."""
+    return _is_system_prefix_str(os.fspath(prefix))
+
+
+@functools.lru_cache(maxsize=256)
+def _is_system_prefix_str(prefix: str) -> bool:
     try:
-        prefix_str = str(prefix.resolve())
-        return "/opt/ros" in prefix_str
+        return (os.path.realpath(prefix) + os.sep).startswith(_SYSTEM_PREFIXES)
     except Exception:
         return False
 
 
 def _workspace_root_from_prefix(prefix: Path) -> Path | None:
     """If prefix is under an install dir, return workspace root (parent of install)."""
+    return _workspace_root_from_prefix_str(os.fspath(prefix))
+
+
+@functools.lru_cache(maxsize=256)
+def _workspace_root_from_prefix_str(prefix: str) -> Path | None:
     try:
-        p = prefix.resolve()
-        if p.name == "install" or (p.parent.name == "install"):
-            root = p.parent if p.name == "install" else p.parent.parent
-            return root
-        return p
+        p = os.path.realpath(prefix)
+        parent = os.path.dirname(p)
+        if os.path.basename(p) == "install":
+            return Path(parent)
+        if os.path.basename(parent) == "install":
+            return Path(os.path.dirname(parent))
+        return Path(p)
     except Exception:
         return None
 
 
+def _add_unseen(
+    by_source: dict[str, list[str]], label: str, names: Iterable[str], seen: set[str]
+) -> None:
+    """Add the names not already in seen to by_source[label] (kept sorted) and mark them seen."""
+    new = set(names)
+    new.difference_update(seen)
+    seen.update(new)
+    by_source[label] = sorted(new.union(by_source.get(label, ())))
+
+
 def list_packages_by_source(
     *,
     extra_source_roots: list[Path] | None = None,
@@ -353,10 +663,10 @@ def list_packages_by_source(
     """
     by_source: dict[str, list[str]] = {}
     seen: set[str] = set()
-    prefixes = _env_paths("AMENT_PREFIX_PATH") + _env_paths("COLCON_PREFIX_PATH")
+    prefixes = _prefix_paths()
     workspace_root_used: Path | None = None  # first non-system workspace = "Workspace"
 
-    for prefix in prefixes:
+    for prefix in _install_prefixes(prefixes):
         share = prefix / "share"
         if not share.exists():
             continue
@@ -364,7 +674,8 @@ def list_packages_by_source(
             label = f"System ({prefix})"
         else:
             root = _workspace_root_from_prefix(prefix)
-            root_resolved = root.resolve() if root else prefix.resolve()
+            # Both are canonical already (_env_paths and _workspace_root_from_prefix realpath)
+            root_resolved = root if root else prefix
             root_str = str(root_resolved)
             if workspace_root_used is None:
                 workspace_root_used = root_resolved
@@ -373,20 +684,12 @@ def list_packages_by_source(
                 label = f"Workspace ({root_str})"
             else:
                 label = f"Other ({root_str})"
-        if label not in by_source:
-            by_source[label] = []
-        for child in share.iterdir():
-            if child.is_dir() and (child / "package.xml").exists():
-                if child.name not in seen:
-                    seen.add(child.name)
-                    by_source[label].append(child.name)
-        if by_source[label]:
-            by_source[label] = sorted(by_source[label])
+        _add_unseen(by_source, label, _share_package_names(share), seen)
 
     # Source space: workspace src trees (from env)
     workspace_srcs: list[tuple[Path, str]] = []
     for env in ("COLCON_PREFIX_PATH", "AMENT_PREFIX_PATH"):
-        for prefix in _env_paths(env):
+        for prefix in prefixes[env]:
             parent = prefix.parent
             if parent.name == "install":
                 src = parent / "src"
@@ -395,63 +698,30 @@ def list_packages_by_source(
                     workspace_srcs.append((src, f"Source ({root_str}/src)"))
     for env in ("ROS2_WORKSPACE", "COLCON_WORKSPACE"):
         for raw in os.environ.get(env, "").split(os.pathsep):
-            p = Path(raw).resolve()
-            if p.exists():
-                src = p / "src" if (p / "src").exists() else p
-                workspace_srcs.append((src.resolve(), f"Source ({src})"))
-
+            p = os.path.realpath(raw)
+            if os.path.exists(p):
+                src = os.path.join(p, "src")
+                src = src if os.path.exists(src) else p
+                workspace_srcs.append((Path(os.path.realpath(src)), f"Source ({src})"))
+
+    # (src, label) for every tree to read: deduplicated env src trees, then user-added roots
+    trees: list[tuple[Path, str]] = []
     seen_src: set[Path] = set()
     for src, label in workspace_srcs:
         if src in seen_src:
             continue
         seen_src.add(src)
-        if label not in by_source:
-            by_source[label] = []
-        for root, _dirs, files in os.walk(src):
-            if "package.xml" not in files:
-                continue
-            pkg_xml = Path(root) / "package.xml"
-            try:
-                with open(pkg_xml) as f:
-                    for line in f:
-                        if "<name>" in line and "</name>" in line:
-                            start = line.find("<name>") + 6
-                            end = line.find("</name>")
-                            name = line[start:end].strip()
-                            if name and name not in seen:
-                                seen.add(name)
-                                by_source[label].append(name)
-                            break
-            except OSError:
-                continue
-        by_source[label] = sorted(by_source[label])
-
-    # User-added source roots
+        trees.append((src, label))
     if extra_source_roots:
         for p in extra_source_roots:
             src = Path(p).resolve()
             if not src.exists() or not src.is_dir():
                 continue
-            label = f"Added ({src})"
-            if label not in by_source:
-                by_source[label] = []
-            for root, _dirs, files in os.walk(src):
-                if "package.xml" not in files:
-                    continue
-                pkg_xml = Path(root) / "package.xml"
-                try:
-                    with open(pkg_xml) as f:
-                        for line in f:
-                            if "<name>" in line and "</name>" in line:
-                                start = line.find("<name>") + 6
-                                end = line.find("</name>")
-                                name = line[start:end].strip()
-                                if name and name not in seen:
-                                    seen.add(name)
-                                    by_source[label].append(name)
-                                break
-                except OSError:
-                    continue
-            by_source[label] = sorted(by_source[label])
+            trees.append((src, f"Added ({src})"))
+
+    # Read all trees at once, then merge in order so earlier sources win duplicates
+    all_packages = _package_names_in_trees([src for src, _label in trees])
+    for (_src, label), packages in zip(trees, all_packages):
+        _add_unseen(by_source, label, (name for name, _pkg_xml in packages), seen)
 
     return by_source
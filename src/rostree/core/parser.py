@@ -2,10 +2,33 @@
 
 from __future__ import annotations
 
-import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+import os
+import re
+import stat
+import sys
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
 from pathlib import Path
 
+# lxml-only iterparse options: comments are never needed, blank text is dropped and only
+# entities declared in the document itself are expanded (as expat does; external ones are
+# never loaded). The stdlib iterparse accepts none of these.
+_LXML_ITERPARSE_OPTIONS: dict[str, bool | str] = {
+    "remove_blank_text": True,
+    "remove_comments": True,
+    "resolve_entities": "internal",
+    "huge_tree": False,
+}
+
+try:
+    from lxml import etree as ET
+
+    _ITERPARSE_OPTIONS = _LXML_ITERPARSE_OPTIONS
+except ImportError:  # lxml is optional (pip install rostree[fast]); stdlib API is compatible
+    import xml.etree.ElementTree as ET
+
+    _ITERPARSE_OPTIONS = {}
+
 # Tags that declare dependency on another ROS package (we collect these for the tree).
 DEPENDENCY_TAGS = (
     "depend",
@@ -14,6 +37,7 @@ DEPENDENCY_TAGS = (
     "build_export_depend",
     "test_depend",
 )
+_DEPENDENCY_TAG_SET = frozenset(DEPENDENCY_TAGS)
 
 
 @dataclass
@@ -31,16 +55,29 @@ class PackageInfo:
         self.dependencies = list(dict.fromkeys(self.dependencies))
 
 
+# Parsed results keyed by (path, mtime_ns, size, include_tags). A changed file gets a new
+# mtime or size and is parsed again. Concurrent writers at worst parse the same file twice.
+_PKG_XML_CACHE: dict[tuple[str, int, int, tuple[str, ...] | None], PackageInfo | None] = {}
+
+
+def clear_package_xml_cache() -> None:
+    """Forget cached parse_package_xml results (e.g. after rewriting files in place)."""
+    _PKG_XML_CACHE.clear()
+
+
+# Names that are not ROS packages: not starting with a letter, python3 / python3-* and
+# lib* (system packages). Matched at the start of the name.
+_NON_ROS_DEP_RE = re.compile(r"[\W\d_]|python3(?:-|$)|lib")
+
+
 def _is_ros_package_dependency(name: str) -> bool:
     """Heuristic: ROS packages are typically lowercase with underscores."""
-    if not name or not name[0].isalpha():
-        return False
-    # Filter common non-ROS entries
-    if name in ("python3", "python3-pytest", "python3-textual", "python3-rich"):
-        return False
-    if name.startswith("python3-") or name.startswith("lib"):
-        return False
-    return True
+    return bool(name) and _NON_ROS_DEP_RE.match(name) is None
+
+
+def _filter_ros_deps(names: Iterable[str]) -> list[str]:
+    """Keep the names that pass _is_ros_package_dependency, in order."""
+    return list(filter(_is_ros_package_dependency, names))
 
 
 def parse_package_xml(
@@ -59,40 +96,77 @@ def parse_package_xml(
         include_tags: If set, only collect deps from these tags (e.g. ("depend", "exec_depend")
             for runtime-only). If None, use all DEPENDENCY_TAGS.
 
+    Results are cached per process by path, modification time, size and include_tags;
+    clear_package_xml_cache() empties the cache.
+
     Returns None if the file cannot be read or is not valid package.xml.
     """
-    if not path.exists() or not path.is_file():
-        return None
     try:
-        tree = ET.parse(path)
-    except (ET.ParseError, OSError):
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
         return None
-    root = tree.getroot()
-    if root.tag != "package":
+    key = (str(path), st.st_mtime_ns, st.st_size, include_tags)
+    if key in _PKG_XML_CACHE:
+        info = _PKG_XML_CACHE[key]
+    else:
+        info = _parse_package_xml_file(path, include_tags)
+        _PKG_XML_CACHE[key] = info
+    if info is None:
         return None
+    # Each caller gets its own copy, so mutating a result cannot leak into the cache
+    return replace(info, dependencies=list(info.dependencies))
+
+
+def _parse_package_xml_file(
+    path: Path,
+    include_tags: tuple[str, ...] | None,
+) -> PackageInfo | None:
+    """Parse an existing package.xml file (uncached worker for parse_package_xml)."""
+    tags = include_tags if include_tags is not None else DEPENDENCY_TAGS
+    # Dependency texts per tag, kept in `tags` order like a per-tag findall would.
+    # Unknown tags are dropped here, so the per-element check below is one dict lookup.
+    found: dict[str, list[str]] = {tag: [] for tag in tags if tag in _DEPENDENCY_TAG_SET}
 
     name = ""
     version = ""
     description = ""
 
-    for child in root:
-        if child.tag == "name" and child.text:
-            name = child.text.strip()
-        elif child.tag == "version" and child.text:
-            version = child.text.strip()
-        elif child.tag == "description" and child.text:
-            description = child.text.strip()
+    # Stream the file: each element is inspected on its end event, then cleared and
+    # detached from its parent, so memory stays proportional to nesting depth.
+    open_elems: list[ET.Element] = []  # elements whose end event has not been seen yet
+    try:
+        with open(path, "rb") as f:
+            for event, elem in ET.iterparse(f, events=("start", "end"), **_ITERPARSE_OPTIONS):
+                if event == "start":
+                    if not open_elems and elem.tag != "package":
+                        return None
+                    open_elems.append(elem)
+                    continue
+                open_elems.pop()
+                depth = len(open_elems)
+                tag = elem.tag
+                # Names and versions recur across manifests (every dependent lists the same
+                # names), so they are interned: one string object each per process
+                if depth == 1 and elem.text:
+                    if tag == "name":
+                        name = sys.intern(elem.text.strip())
+                    elif tag == "version":
+                        version = sys.intern(elem.text.strip())
+                    elif tag == "description":
+                        description = elem.text.strip()
+                texts = found.get(tag)
+                if texts is not None and elem.text:
+                    texts.append(sys.intern(elem.text.strip()))
+                if depth > 0:
+                    elem.clear()
+                    # A just-closed element is always its parent's last child so far
+                    del open_elems[-1][-1]
+    except (ET.ParseError, OSError):
+        return None
 
-    tags = include_tags if include_tags is not None else DEPENDENCY_TAGS
-    deps: list[str] = []
-    for tag in tags:
-        if tag not in DEPENDENCY_TAGS:
-            continue
-        for elem in root.findall(f".//{tag}"):
-            if elem.text:
-                dep = elem.text.strip()
-                if _is_ros_package_dependency(dep):
-                    deps.append(dep)
+    deps = _filter_ros_deps(dep for texts in found.values() for dep in texts)
 
     if not name:
         return None
@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 
 from rostree.core.parser import PackageInfo, parse_package_xml
-from rostree.core.finder import find_package_path
+from rostree.core.finder import package_resolver
 
 
-@dataclass
+@dataclass(slots=True)
 class DependencyNode:
     """A node in the dependency tree: one ROS package and its direct children."""
 
@@ -23,14 +26,25 @@ class DependencyNode:
 
     def to_dict(self) -> dict:
         """Serialize node to a JSON-friendly dict (for API/frontend)."""
-        return {
-            "name": self.name,
-            "version": self.version,
-            "description": self.description,
-            "path": str(self.path),
-            "children": [c.to_dict() for c in self.children],
-        }
-
+        # Iterative: each node's dict is created empty as a slot in its parent's children
+        # list and filled when popped, so deep trees need no recursion.
+        root: dict = {}
+        stack: list[tuple[DependencyNode, dict]] = [(self, root)]
+        while stack:
+            node, out = stack.pop()
+            children = node.children
+            kids: list[dict] = [{} for _ in children]
+            out["name"] = node.name
+            out["version"] = node.version
+            out["description"] = node.description
+            out["path"] = str(node.path)
+            out["children"] = kids
+            stack.extend(zip(children, kids))
+        return root
+
+
+# Upper bound on threads expanding the root package's direct dependencies.
+_MAX_EXPAND_WORKERS = min(8, os.cpu_count() or 1)
 
 # Tags used when runtime_only=True (smaller, faster tree; no build/test deps).
 _RUNTIME_DEPENDENCY_TAGS = ("depend", "exec_depend")
@@ -43,8 +57,10 @@ def build_dependency_tree(
     include_buildtool: bool = False,
     runtime_only: bool = False,
     extra_source_roots: list[Path] | None = None,
+    parser: Callable[..., PackageInfo | None] | None = None,
     _depth: int = 0,
     _visited: set[str] | None = None,
+    _resolve: Callable[[str], Path | None] | None = None,
 ) -> DependencyNode | None:
     """
     Build a dependency tree starting from a root package name.
@@ -60,8 +76,12 @@ def build_dependency_tree(
         runtime_only: If True, only depend and exec_depend (no build/test deps);
             much smaller and faster for packages with heavy build toolchains.
         extra_source_roots: Optional list of Paths to scan for packages (user-added).
+        parser: Optional replacement for parse_package_xml, called as
+            ``parser(path, include_tags=...)`` for every resolved package.
         _depth: Internal recursion depth.
-        _visited: Internal set of already-visited package names.
+        _visited: Internal set of the package names on the current path (ancestors).
+        _resolve: Internal package lookup shared by the whole build, so source roots
+            are indexed once instead of walked again for every package.
 
     Returns:
         DependencyNode for the root, or None if root package is not found.
@@ -78,10 +98,12 @@ def build_dependency_tree(
     if max_depth is not None and _depth > max_depth:
         return None
 
-    roots: list[Path] | None = None
-    if extra_source_roots is not None:
-        roots = [Path(p).resolve() for p in extra_source_roots]
-    pkg_path = find_package_path(root_package, extra_source_roots=roots)
+    if _resolve is None:
+        roots: list[Path] | None = None
+        if extra_source_roots is not None:
+            roots = [Path(p).resolve() for p in extra_source_roots]
+        _resolve = package_resolver(roots)
+    pkg_path = _resolve(root_package)
     if pkg_path is None:
         return DependencyNode(
             name=root_package,
@@ -91,7 +113,9 @@ def build_dependency_tree(
         )
 
     include_tags = _RUNTIME_DEPENDENCY_TAGS if runtime_only else None
-    info = parse_package_xml(pkg_path, include_tags=include_tags)
+    if parser is None:
+        parser = parse_package_xml
+    info = parser(pkg_path, include_tags=include_tags)
     if info is None:
         return DependencyNode(
             name=root_package,
@@ -101,19 +125,32 @@ def build_dependency_tree(
         )
 
     _visited.add(root_package)
-    children: list[DependencyNode] = []
-    for dep in info.dependencies:
-        child = build_dependency_tree(
+
+    def _expand(dep: str, ancestors: set[str]) -> DependencyNode | None:
+        return build_dependency_tree(
             dep,
             max_depth=max_depth,
             include_buildtool=include_buildtool,
             runtime_only=runtime_only,
             extra_source_roots=extra_source_roots,
+            parser=parser,
             _depth=_depth + 1,
-            _visited=set(_visited),
+            _visited=ancestors,
+            _resolve=_resolve,
         )
-        if child is not None:
-            children.append(child)
+
+    deps = info.dependencies
+    if _depth == 0 and len(deps) > 1:
+        # Fan out the root's subtrees only: lookups and parses are I/O bound, and deeper
+        # levels stay sequential so a bounded pool never waits on its own queued work.
+        # Concurrent branches each get their own copy of the ancestor set.
+        with ThreadPoolExecutor(max_workers=min(_MAX_EXPAND_WORKERS, len(deps))) as pool:
+            expanded = list(pool.map(lambda dep: _expand(dep, set(_visited)), deps))
+    else:
+        # Sequential branches share the set: every call removes the name it added before
+        # returning, so the set always holds exactly the current path's ancestors.
+        expanded = [_expand(dep, _visited) for dep in deps]
+    children = [child for child in expanded if child is not None]
     _visited.discard(root_package)
 
     return DependencyNode(
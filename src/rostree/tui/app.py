@@ -51,24 +51,30 @@ COLOR_STATS = "cyan"
 COLOR_PATH = "dim"
 
 
+def _summarize(node: Any) -> tuple[int, int, int, int]:
+    """Return (node_count, direct_children, total_descendants, max_depth) in one walk."""
+    children = getattr(node, "children", None) or ()
+    total = 0
+    max_d = 0
+    # Explicit stack: no Python frame per node and no recursion limit on deep trees
+    stack = [(c, 1) for c in children]
+    while stack:
+        current, depth = stack.pop()
+        total += 1
+        if depth > max_d:
+            max_d = depth
+        stack.extend((c, depth + 1) for c in getattr(current, "children", None) or ())
+    return total + 1, len(children), total, max_d
+
+
 def _count_nodes(node: Any) -> int:
     """Count nodes in tree (for cap)."""
-    n = 1
-    for c in getattr(node, "children", []):
-        n += _count_nodes(c)
-    return n
+    return _summarize(node)[0]
 
 
 def _node_stats(node: Any) -> tuple[int, int, int]:
     """Return (direct_children, total_descendants, max_depth) for a node."""
-    children = getattr(node, "children", []) or []
-    direct = len(children)
-    total = 0
-    max_d = 0
-    for c in children:
-        sub_direct, sub_total, sub_depth = _node_stats(c)
-        total += 1 + sub_total
-        max_d = max(max_d, 1 + sub_depth)
+    _, direct, total, max_d = _summarize(node)
     return direct, total, max_d
 
 
@@ -597,7 +603,7 @@ class DepTreeApp(App[None]):
         desc = getattr(node, "description", "") or "(no description)"
         path = getattr(node, "path", "") or "(n/a)"
 
-        direct, total_desc, max_depth = _node_stats(node)
+        _, direct, total_desc, max_depth = _summarize(node)
 
         lines = [
             f"[{COLOR_HEADER}]Package[/]",
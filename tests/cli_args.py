@@ -0,0 +1,70 @@
+"""Helpers for CLI tests: argparse namespace stand-ins and sub-parser lookup."""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+
+
+def subcommand_parser(parser: argparse.ArgumentParser, name: str) -> argparse.ArgumentParser:
+    """Return the sub-parser registered for a CLI subcommand."""
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            return action.choices[name]
+    raise KeyError(name)
+
+
+@dataclass(frozen=True)
+class ScanArgs:
+    """Stand-in for the parsed ``rostree scan`` arguments (home/system scanning off)."""
+
+    paths: list[str] | None = None
+    depth: int = 4
+    no_home: bool = True
+    no_system: bool = True
+    verbose: bool = False
+    json: bool = False
+
+
+@dataclass(frozen=True)
+class ListArgs:
+    """Stand-in for the parsed ``rostree list`` arguments."""
+
+    source: list[str] | None = None
+    by_source: bool = False
+    verbose: bool = False
+    json: bool = False
+
+
+@dataclass(frozen=True)
+class TreeArgs:
+    """Stand-in for the parsed ``rostree tree`` arguments."""
+
+    package: str = ""
+    depth: int | None = None
+    runtime: bool = False
+    source: list[str] | None = None
+    json: bool = False
+
+
+@dataclass(frozen=True)
+class GraphArgs:
+    """Stand-in for the parsed ``rostree graph`` arguments."""
+
+    package: str | None = None
+    workspace: str | None = None
+    format: str = "dot"
+    output: str | None = None
+    depth: int | None = None
+    runtime: bool = False
+    source: list[str] | None = None
+    no_title: bool = False
+    render: str | None = None
+    open: bool = False
+
+
+@dataclass(frozen=True)
+class TuiArgs:
+    """Stand-in for the parsed ``rostree tui`` arguments."""
+
+    package: str | None = None
@@ -0,0 +1,60 @@
+"""Shared pytest helpers for rostree tests."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import rostree.cli
+from rostree.core.finder import clear_prefix_cache
+from rostree.core.parser import clear_package_xml_cache
+
+
+# Environment variables rostree reads to locate install prefixes and workspaces
+ROS_ENV_VARS = ("AMENT_PREFIX_PATH", "COLCON_PREFIX_PATH", "ROS2_WORKSPACE", "COLCON_WORKSPACE")
+
+
+@pytest.fixture
+def clean_ros_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Blank the ROS/colcon discovery variables for the duration of a test."""
+    for var in ROS_ENV_VARS:
+        monkeypatch.setenv(var, "")
+
+
+# (directory name, package.xml bytes) for the shared many-packages workspace
+_MANY_PKGS = tuple(
+    (f"pkg_{i:02d}", b"<package><name>pkg_%02d</name></package>" % i) for i in range(55)
+)
+
+
+@pytest.fixture(scope="session")
+def many_pkg_ws(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Workspace whose src holds 55 minimal packages (pkg_00..pkg_54), built once per session."""
+    ws = tmp_path_factory.mktemp("many_pkg_ws")
+    src = os.path.join(ws, "src")
+    os.mkdir(src)
+
+    def write_pkg(item: tuple[str, bytes]) -> None:
+        name, xml = item
+        pkg_dir = os.path.join(src, name)
+        os.mkdir(pkg_dir)
+        with open(os.path.join(pkg_dir, "package.xml"), "wb") as f:
+            f.write(xml)
+
+    # Independent mkdir/write pairs; the syscalls release the GIL so threads overlap them
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(write_pkg, _MANY_PKGS))
+    return ws
+
+
+@pytest.fixture(autouse=True)
+def _clear_rostree_caches() -> None:
+    """Start every test with empty process-wide discovery and tool-probe caches."""
+    rostree.cli._check_graphviz.cache_clear()
+    rostree.cli._check_matplotlib.cache_clear()
+    rostree.cli._load_pyplot.cache_clear()
+    clear_package_xml_cache()
+    clear_prefix_cache()
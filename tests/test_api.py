@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 
-import os
 import re
 from pathlib import Path
 from unittest import mock
 
+import pytest
 
 from rostree.api import (
     list_known_packages,
@@ -18,6 +18,8 @@ from rostree.api import (
 from rostree.core.finder import WorkspaceInfo
 import rostree
 
+pytestmark = pytest.mark.usefixtures("clean_ros_env")
+
 
 class TestModuleExports:
     """Tests for rostree module-level exports."""
@@ -103,32 +105,12 @@ class TestListKnownPackages:
         pkg_xml = pkg_dir / "package.xml"
         pkg_xml.write_text("<package><name>api_test_pkg</name></package>")
 
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = list_known_packages(extra_source_roots=[tmp_path])
-            assert "api_test_pkg" in result
+        result = list_known_packages(extra_source_roots=[tmp_path])
+        assert "api_test_pkg" in result
 
     def test_empty_env(self) -> None:
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = list_known_packages()
-            assert isinstance(result, dict)
+        result = list_known_packages()
+        assert isinstance(result, dict)
 
 
 class TestListKnownPackagesBySource:
@@ -139,21 +121,11 @@ class TestListKnownPackagesBySource:
         pkg_dir.mkdir()
         (pkg_dir / "package.xml").write_text("<package><name>source_pkg</name></package>")
 
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = list_known_packages_by_source(extra_source_roots=[tmp_path])
-            assert isinstance(result, dict)
-            # Should have Added section
-            added_keys = [k for k in result.keys() if "Added" in k]
-            assert len(added_keys) == 1
+        result = list_known_packages_by_source(extra_source_roots=[tmp_path])
+        assert isinstance(result, dict)
+        # Should have Added section
+        added_keys = [k for k in result.keys() if "Added" in k]
+        assert len(added_keys) == 1
 
 
 class TestGetPackageInfo:
@@ -172,36 +144,16 @@ class TestGetPackageInfo:
 </package>
 """
         )
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = get_package_info("info_pkg", extra_source_roots=[tmp_path])
-            assert result is not None
-            assert result.name == "info_pkg"
-            assert result.version == "2.3.4"
-            assert result.description == "Info test package"
-            assert "rclpy" in result.dependencies
+        result = get_package_info("info_pkg", extra_source_roots=[tmp_path])
+        assert result is not None
+        assert result.name == "info_pkg"
+        assert result.version == "2.3.4"
+        assert result.description == "Info test package"
+        assert "rclpy" in result.dependencies
 
     def test_package_not_found(self, tmp_path: Path) -> None:
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = get_package_info("nonexistent_xyz", extra_source_roots=[tmp_path])
-            assert result is None
+        result = get_package_info("nonexistent_xyz", extra_source_roots=[tmp_path])
+        assert result is None
 
 
 class TestBuildTree:
@@ -219,19 +171,9 @@ class TestBuildTree:
 </package>
 """
         )
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = build_tree("tree_pkg", extra_source_roots=[tmp_path])
-            assert result is not None
-            assert result.name == "tree_pkg"
+        result = build_tree("tree_pkg", extra_source_roots=[tmp_path])
+        assert result is not None
+        assert result.name == "tree_pkg"
 
     def test_with_max_depth(self, tmp_path: Path) -> None:
         pkg_dir = tmp_path / "depth_pkg"
@@ -245,18 +187,8 @@ class TestBuildTree:
 </package>
 """
         )
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = build_tree("depth_pkg", max_depth=2, extra_source_roots=[tmp_path])
-            assert result is not None
+        result = build_tree("depth_pkg", max_depth=2, extra_source_roots=[tmp_path])
+        assert result is not None
 
     def test_runtime_only(self, tmp_path: Path) -> None:
         pkg_dir = tmp_path / "runtime_pkg"
@@ -272,21 +204,11 @@ class TestBuildTree:
 </package>
 """
         )
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = build_tree("runtime_pkg", runtime_only=True, extra_source_roots=[tmp_path])
-            assert result is not None
-            child_names = [c.name for c in result.children]
-            assert "dep_a" in child_names
-            assert "build_only" not in child_names
+        result = build_tree("runtime_pkg", runtime_only=True, extra_source_roots=[tmp_path])
+        assert result is not None
+        child_names = [c.name for c in result.children]
+        assert "dep_a" in child_names
+        assert "build_only" not in child_names
 
 
 class TestScanWorkspaces:
@@ -0,0 +1,1043 @@
+"""Tests for rostree CLI commands (scan, list, tree, graph, render, tui)."""
+
+import contextlib
+import os
+import subprocess
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+from rostree.cli import (
+    cmd_scan,
+    cmd_list,
+    cmd_tree,
+    cmd_graph,
+    main,
+    build_parser,
+    _get_parser,
+    _get_workspace_packages,
+    _graph_edges,
+    _check_graphviz,
+    _check_matplotlib,
+    _render_dot,
+    _render_with_matplotlib,
+)
+from rostree.core.tree import DependencyNode
+from tests.cli_args import GraphArgs, ListArgs, ScanArgs, TreeArgs, TuiArgs, subcommand_parser
+
+pytestmark = pytest.mark.usefixtures("clean_ros_env")
+
+# src/ of this checkout, for tests that run the CLI in a subprocess
+_SRC_DIR = str(Path(__file__).resolve().parent.parent / "src")
+
+# Frozen default argument sets, shared by tests that pass no overrides
+_DEFAULT_SCAN = ScanArgs()
+_DEFAULT_LIST = ListArgs()
+_DEFAULT_GRAPH = GraphArgs()
+_DEFAULT_TUI = TuiArgs()
+
+_PKG_XML = b"""<?xml version="1.0"?>
+<package format="3">
+    <name>%s</name>
+    <version>1.0.0</version>
+    <description>t</description>
+</package>
+"""
+
+
+def _mkpkg(parent: str | os.PathLike[str], name: str) -> str:
+    """Create parent/<name> containing a minimal package.xml and return the package dir."""
+    # Plain os.path strings: no intermediate Path objects per package
+    pkg = os.path.join(parent, name)
+    os.mkdir(pkg)
+    # Unbuffered write: no io wrapper object for a file written in one call
+    fd = os.open(os.path.join(pkg, "package.xml"), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, _PKG_XML % name.encode())
+    finally:
+        os.close(fd)
+    return pkg
+
+
+@pytest.fixture(scope="module")
+def render_src(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Source root holding a single render_pkg, shared by the image rendering tests."""
+    src = tmp_path_factory.mktemp("render_src")
+    _mkpkg(src, "render_pkg")
+    return src
+
+
+@pytest.fixture(scope="module")
+def sample_edges() -> tuple[frozenset[tuple[str, str]], frozenset[str]]:
+    """A small A -> B -> C graph (edges, root names) for the matplotlib renderer tests."""
+    return frozenset({("A", "B"), ("B", "C")}), frozenset({"A"})
+
+
+class TestCmdScan:
+    """Tests for cmd_scan command."""
+
+    __slots__ = ()
+
+    def test_no_args(self) -> None:
+        args = _DEFAULT_SCAN
+        result = cmd_scan(args)
+        assert result == 0
+
+    def test_with_paths(self, tmp_path: Path) -> None:
+        ws = tmp_path / "ws"
+        (ws / "src").mkdir(parents=True)
+
+        args = ScanArgs(paths=[str(ws)], depth=2)
+        result = cmd_scan(args)
+        assert result == 0
+
+    def test_verbose(self, tmp_path: Path, capsys) -> None:
+        ws = tmp_path / "ws"
+        src = ws / "src"
+        src.mkdir(parents=True)
+        # Add a package
+        _mkpkg(src, "my_pkg")
+
+        args = ScanArgs(paths=[str(ws)], depth=2, verbose=True)
+        result = cmd_scan(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "my_pkg" in captured.out
+
+    def test_verbose_many_packages(self, many_pkg_ws: Path, capsys) -> None:
+        """Test verbose output truncation for workspaces with many packages."""
+        # The shared workspace has 55 packages; only the first 20 are listed
+        args = ScanArgs(paths=[str(many_pkg_ws)], depth=2, verbose=True)
+        result = cmd_scan(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "and 35 more" in captured.out
+
+    def test_json_output(self, tmp_path: Path, capsysbinary) -> None:
+        ws = tmp_path / "ws"
+        (ws / "src").mkdir(parents=True)
+
+        args = ScanArgs(paths=[str(ws)], depth=2, json=True)
+        result = cmd_scan(args)
+        assert result == 0
+        captured = capsysbinary.readouterr()
+        # Should be valid JSON (list)
+        data = _loads(captured.out)
+        assert isinstance(data, list)
+
+    def test_no_workspaces_found(self, tmp_path: Path, capsysbinary) -> None:
+        args = ScanArgs(paths=[str(tmp_path)], depth=1)
+        result = cmd_scan(args)
+        assert result == 0
+        captured = capsysbinary.readouterr()
+        assert b"No ROS 2 workspaces found" in captured.out
+
+    @pytest.mark.parametrize(
+        ("subdirs", "expected"),
+        [
+            (("install",), "install"),
+            (("src", "build"), "build"),
+        ],
+        ids=["install_only", "with_build"],
+    )
+    def test_workspace_status(
+        self, tmp_path: Path, capsys, subdirs: tuple[str, ...], expected: str
+    ) -> None:
+        """Test workspace status lists install-only and build directories."""
+        ws = tmp_path / "ws"
+        for subdir in subdirs:
+            (ws / subdir).mkdir(parents=True)
+
+        args = ScanArgs(paths=[str(ws)], depth=2)
+        result = cmd_scan(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert expected in captured.out
+
+
+class TestCmdList:
+    """Tests for cmd_list command."""
+
+    __slots__ = ()
+
+    def test_no_packages(self) -> None:
+        args = _DEFAULT_LIST
+        result = cmd_list(args)
+        assert result in (0, 1)
+
+    def test_with_source(self, tmp_path: Path, capsys) -> None:
+        _mkpkg(tmp_path, "list_pkg")
+
+        args = ListArgs(source=[str(tmp_path)])
+        result = cmd_list(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "list_pkg" in captured.out
+
+    def test_by_source(self, tmp_path: Path, capsys) -> None:
+        _mkpkg(tmp_path, "source_pkg")
+
+        args = ListArgs(source=[str(tmp_path)], by_source=True)
+        result = cmd_list(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        # Without verbose, package names aren't shown, but Added section is
+        assert "Added" in captured.out
+
+    def test_by_source_verbose(self, tmp_path: Path, capsys) -> None:
+        _mkpkg(tmp_path, "verbose_pkg")
+
+        args = ListArgs(source=[str(tmp_path)], by_source=True, verbose=True)
+        result = cmd_list(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "verbose_pkg" in captured.out
+
+    def test_json_output(self, tmp_path: Path, capsysbinary) -> None:
+        _mkpkg(tmp_path, "json_pkg")
+
+        args = ListArgs(source=[str(tmp_path)], json=True)
+        result = cmd_list(args)
+        assert result == 0
+        captured = capsysbinary.readouterr()
+        data = _loads(captured.out)
+        assert "json_pkg" in data
+
+    def test_by_source_json(self, tmp_path: Path, capsysbinary) -> None:
+        _mkpkg(tmp_path, "bsj_pkg")
+
+        args = ListArgs(source=[str(tmp_path)], by_source=True, json=True)
+        result = cmd_list(args)
+        assert result == 0
+        captured = capsysbinary.readouterr()
+        data = _loads(captured.out)
+        assert isinstance(data, dict)
+
+    def test_verbose_list(self, tmp_path: Path, capsys) -> None:
+        _mkpkg(tmp_path, "vlist_pkg")
+
+        args = ListArgs(source=[str(tmp_path)], verbose=True)
+        result = cmd_list(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        # Verbose shows path
+        assert "vlist_pkg" in captured.out
+
+    def test_by_source_many_packages(self, many_pkg_ws: Path, capsys) -> None:
+        """Test by-source verbose with many packages (>50 truncation)."""
+        args = ListArgs(source=[str(many_pkg_ws / "src")], by_source=True, verbose=True)
+        result = cmd_list(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "and 5 more" in captured.out
+
+    def test_json_many_packages(self, many_pkg_ws: Path, capsysbinary) -> None:
+        """Test --json output lists every package of a large workspace."""
+        args = ListArgs(source=[str(many_pkg_ws / "src")], json=True)
+        result = cmd_list(args)
+        assert result == 0
+        data = _loads(capsysbinary.readouterr().out)
+        assert sorted(data) == [f"pkg_{i:02d}" for i in range(55)]
+
+    def test_by_source_output_format(self, tmp_path: Path, capsys) -> None:
+        """Test by-source output format."""
+        _mkpkg(tmp_path, "format_pkg")
+
+        args = ListArgs(source=[str(tmp_path)], by_source=True)
+        result = cmd_list(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "package(s)" in captured.out
+        assert "source(s)" in captured.out
+
+    @mock.patch("rostree.cli.list_packages_by_source", return_value={})
+    def test_by_source_empty_returns_error(self, _mock_by_source, capsysbinary) -> None:
+        """Test by-source returns 1 when no packages found."""
+        args = ListArgs(by_source=True)
+        result = cmd_list(args)
+        assert result == 1
+        captured = capsysbinary.readouterr()
+        assert b"No packages found" in captured.out
+
+    @mock.patch("rostree.cli.list_package_paths", return_value={})
+    def test_no_packages_found_non_by_source(self, _mock_paths, capsysbinary) -> None:
+        """Test list without by_source returns 1 when no packages found."""
+        result = cmd_list(_DEFAULT_LIST)
+        assert result == 1
+        captured = capsysbinary.readouterr()
+        assert b"No packages found" in captured.out
+
+
+class TestCmdTree:
+    """Tests for cmd_tree command."""
+
+    __slots__ = ()
+
+    def test_package_not_found(self, capsys) -> None:
+        args = TreeArgs(package="nonexistent_xyz")
+        result = cmd_tree(args)
+        captured = capsys.readouterr()
+        # Returns 0 because tree is built with "(not found)"
+        assert result == 0
+        assert "nonexistent_xyz" in captured.out
+
+    @mock.patch("rostree.cli.build_dependency_tree", return_value=None)
+    def test_tree_returns_none(self, _mock_build, capsys) -> None:
+        """Test error handling when build_dependency_tree returns None."""
+        args = TreeArgs(package="any_pkg")
+        result = cmd_tree(args)
+        assert result == 1
+        captured = capsys.readouterr()
+        assert "not found" in captured.err.lower()
+
+    def test_with_source(self, tmp_path: Path, capsys) -> None:
+        _mkpkg(tmp_path, "tree_pkg")
+        args = TreeArgs(package="tree_pkg", source=[str(tmp_path)])
+        result = cmd_tree(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "tree_pkg" in captured.out
+
+    def test_json_output(self, tmp_path: Path, capsysbinary) -> None:
+        _mkpkg(tmp_path, "json_tree")
+        args = TreeArgs(package="json_tree", source=[str(tmp_path)], json=True)
+        result = cmd_tree(args)
+        assert result == 0
+        captured = capsysbinary.readouterr()
+        data = _loads(captured.out)
+        assert data["name"] == "json_tree"
+
+    @pytest.mark.parametrize("block_orjson", [False, True], ids=["default", "no-orjson"])
+    def test_json_output_non_utf8_stdout(self, tmp_path: Path, block_orjson: bool) -> None:
+        pkg = tmp_path / "uni_pkg"
+        pkg.mkdir()
+        (pkg / "package.xml").write_text(
+            "<package><name>uni_pkg</name><description>Checked ✓</description></package>",
+            encoding="utf-8",
+        )
+        env = dict(os.environ, PYTHONIOENCODING="cp1252")
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, (_SRC_DIR, env.get("PYTHONPATH"))))
+        # None in sys.modules makes `import orjson` fail, forcing the stdlib backend
+        code = "import sys\n"
+        if block_orjson:
+            code += "sys.modules['orjson'] = None\n"
+        code += "from rostree.cli import main\nsys.exit(main())\n"
+        result = subprocess.run(
+            [sys.executable, "-c", code, "tree", "uni_pkg", "-s", str(tmp_path), "--json"],
+            capture_output=True,
+            env=env,
+            check=False,
+        )
+        assert result.returncode == 0, result.stderr.decode(errors="replace")
+        assert _loads(result.stdout)["description"] == "Checked ✓"
+
+    def test_with_depth(self, tmp_path: Path) -> None:
+        _mkpkg(tmp_path, "depth_tree")
+        args = TreeArgs(package="depth_tree", depth=2, source=[str(tmp_path)])
+        result = cmd_tree(args)
+        assert result == 0
+
+    def test_runtime_only(self, tmp_path: Path) -> None:
+        _mkpkg(tmp_path, "runtime_tree")
+        args = TreeArgs(package="runtime_tree", runtime=True, source=[str(tmp_path)])
+        result = cmd_tree(args)
+        assert result == 0
+
+
+class TestMain:
+    """Tests for main entry point."""
+
+    __slots__ = ()
+
+    def test_scan_command(self) -> None:
+        # Run scan with no home/system to be fast
+        result = main(["scan", "--no-home", "--no-system"])
+        assert result == 0
+
+    def test_list_command(self, capsysbinary) -> None:
+        result = main(["list", "--json"])
+        assert result == 0
+        # May have no packages, but --json always prints an object
+        assert isinstance(_loads(capsysbinary.readouterr().out), dict)
+
+    def test_tree_command(self) -> None:
+        result = main(["tree", "nonexistent_test_pkg"])
+        assert result == 0  # Returns placeholder node
+
+    def test_parser_built_once(self) -> None:
+        with mock.patch("rostree.cli.build_parser", wraps=build_parser) as spy:
+            main(["scan", "--no-home", "--no-system"])
+            main(["tree", "nonexistent_test_pkg"])
+        # The parser is cached at module level; it is built at most once per process
+        assert spy.call_count <= 1
+
+
+class TestCmdGraph:
+    """Tests for cmd_graph command."""
+
+    __slots__ = ()
+
+    def test_single_package(self, tmp_path: Path, capsys) -> None:
+        """Test graphing a single package."""
+        _mkpkg(tmp_path, "graph_pkg")
+        args = GraphArgs(package="graph_pkg", source=[str(tmp_path)])
+        result = cmd_graph(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "digraph dependencies" in captured.out
+        assert "graph_pkg" in captured.out
+
+    def test_mermaid_format(self, tmp_path: Path, capsys) -> None:
+        """Test mermaid output format."""
+        _mkpkg(tmp_path, "mermaid_pkg")
+        args = GraphArgs(package="mermaid_pkg", format="mermaid", source=[str(tmp_path)])
+        result = cmd_graph(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "graph LR" in captured.out
+
+    def test_output_to_file(self, tmp_path: Path) -> None:
+        """Test writing graph to file."""
+        _mkpkg(tmp_path, "file_pkg")
+        output_file = tmp_path / "output.dot"
+        args = GraphArgs(package="file_pkg", output=str(output_file), source=[str(tmp_path)])
+        result = cmd_graph(args)
+        assert result == 0
+        assert output_file.exists()
+        content = output_file.read_text()
+        assert "digraph dependencies" in content
+
+    def test_workspace_flag(self, tmp_path: Path, capsys) -> None:
+        """Test graphing a workspace."""
+        ws = tmp_path / "ws"
+        src = ws / "src"
+        src.mkdir(parents=True)
+        _mkpkg(src, "ws_pkg")
+        args = GraphArgs(workspace=str(ws), depth=2)
+        result = cmd_graph(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "ws_pkg" in captured.out
+
+    def test_no_title_flag(self, tmp_path: Path, capsys) -> None:
+        """Test --no-title flag."""
+        _mkpkg(tmp_path, "notitle_pkg")
+        args = GraphArgs(package="notitle_pkg", source=[str(tmp_path)], no_title=True)
+        result = cmd_graph(args)
+        assert result == 0
+        captured = capsys.readouterr()
+        assert "label=" not in captured.out
+
+    def test_empty_workspace_error(self, tmp_path: Path, capsys) -> None:
+        """Test error when workspace has no packages."""
+        ws = tmp_path / "empty_ws"
+        (ws / "src").mkdir(parents=True)
+
+        args = GraphArgs(workspace=str(ws), depth=2)
+        result = cmd_graph(args)
+        assert result == 1
+        captured = capsys.readouterr()
+        assert "No packages found" in captured.err
+
+    def test_no_workspace_no_package_error(self, capsys) -> None:
+        """Test error when no package specified and no workspace packages found."""
+        with mock.patch("rostree.cli.list_packages_by_source", return_value={}):
+            args = _DEFAULT_GRAPH
+            result = cmd_graph(args)
+            assert result == 1
+            captured = capsys.readouterr()
+            assert "No workspace packages found" in captured.err
+
+    def test_depth_limit(self, tmp_path: Path) -> None:
+        """Test depth limiting."""
+        _mkpkg(tmp_path, "depth_pkg")
+        args = GraphArgs(package="depth_pkg", depth=1, source=[str(tmp_path)])
+        result = cmd_graph(args)
+        assert result == 0
+
+    def test_text_output_skips_renderer_probes(self, tmp_path: Path) -> None:
+        """Test DOT text output never probes for Graphviz or matplotlib."""
+        _mkpkg(tmp_path, "text_pkg")
+        args = GraphArgs(
+            package="text_pkg", output=str(tmp_path / "out.dot"), source=[str(tmp_path)]
+        )
+        with mock.patch("rostree.cli._check_graphviz") as mock_gv:
+            with mock.patch("rostree.cli._check_matplotlib") as mock_mpl:
+                result = cmd_graph(args)
+        assert result == 0
+        mock_gv.assert_not_called()
+        mock_mpl.assert_not_called()
+
+    def test_render_mermaid_error(self, tmp_path: Path, capsys) -> None:
+        """Test error when trying to render mermaid format."""
+        _mkpkg(tmp_path, "render_pkg")
+        args = GraphArgs(
+            package="render_pkg",
+            format="mermaid",
+            depth=1,
+            source=[str(tmp_path)],
+            render="png",
+        )
+        result = cmd_graph(args)
+        assert result == 1
+        captured = capsys.readouterr()
+        assert "mermaid" in captured.err.lower()
+
+    def test_render_with_graphviz(self, tmp_path: Path, render_src: Path) -> None:
+        """Test rendering to PNG when graphviz is available."""
+        # Only run if graphviz is installed
+        if not _check_graphviz():
+            return
+
+        output_file = tmp_path / "test.png"
+        args = GraphArgs(
+            package="render_pkg",
+            output=str(output_file),
+            depth=1,
+            source=[str(render_src)],
+            render="png",
+        )
+        result = cmd_graph(args)
+        assert result == 0
+        assert output_file.exists()
+
+
+class TestGraphvizHelpers:
+    """Tests for Graphviz helper functions."""
+
+    __slots__ = ()
+
+    def test_check_graphviz(self) -> None:
+        """Test graphviz check returns bool."""
+        result = _check_graphviz()
+        assert isinstance(result, bool)
+
+    def test_render_dot_no_graphviz(self, tmp_path: Path, capsys) -> None:
+        """Test render_dot error when graphviz not available."""
+        with mock.patch("rostree.cli.shutil.which", return_value=None):
+            result = _render_dot("digraph {}", tmp_path / "out.png", "png")
+            assert result is False
+            captured = capsys.readouterr()
+            assert "Graphviz not found" in captured.err
+
+    def test_render_dot_with_graphviz(self, tmp_path: Path) -> None:
+        """Test render_dot succeeds when graphviz is available."""
+        if not _check_graphviz():
+            return  # Skip if graphviz not installed
+
+        dot_content = 'digraph { "A" -> "B"; }'
+        output = tmp_path / "test.png"
+        result = _render_dot(dot_content, output, "png")
+        assert result is True
+        assert output.exists()
+
+
+class TestMatplotlibHelpers:
+    """Tests for matplotlib rendering helper functions."""
+
+    __slots__ = ()
+
+    def test_check_matplotlib(self) -> None:
+        """Test matplotlib check returns bool."""
+
+        result = _check_matplotlib()
+        assert isinstance(result, bool)
+
+    def test_check_matplotlib_not_installed(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test matplotlib check when not installed."""
+        # A None entry in sys.modules makes the import raise ImportError
+        monkeypatch.setitem(sys.modules, "matplotlib", None)
+        monkeypatch.setitem(sys.modules, "networkx", None)
+        _check_matplotlib.cache_clear()
+        assert _check_matplotlib() is False
+
+    def test_render_with_matplotlib_success(self, tmp_path: Path, sample_edges) -> None:
+        """Test matplotlib rendering succeeds."""
+        if not _check_matplotlib():
+            return  # Skip if matplotlib not installed
+
+        edges, root_names = sample_edges
+        output = tmp_path / "test.png"
+
+        result = _render_with_matplotlib(edges, root_names, output, "png", "Test Graph")
+        assert result is True
+        assert output.exists()
+        assert output.stat().st_size > 0
+
+    def test_render_with_matplotlib_svg(self, tmp_path: Path, sample_edges) -> None:
+        """Test matplotlib rendering to SVG."""
+        if not _check_matplotlib():
+            return  # Skip if matplotlib not installed
+
+        edges, root_names = sample_edges
+        output = tmp_path / "test.svg"
+
+        result = _render_with_matplotlib(edges, root_names, output, "svg", None)
+        assert result is True
+        assert output.exists()
+
+    def test_render_with_matplotlib_empty_graph(self, tmp_path: Path, capsys) -> None:
+        """Test matplotlib rendering with empty graph (rejected before importing matplotlib)."""
+        output = tmp_path / "test.png"
+
+        with mock.patch("rostree.cli._load_pyplot") as mock_load:
+            result = _render_with_matplotlib(frozenset(), frozenset(), output, "png", None)
+        assert result is False
+        mock_load.assert_not_called()
+        captured = capsys.readouterr()
+        assert "empty" in captured.err.lower()
+
+    def test_render_with_matplotlib_isolated_nodes(self, tmp_path: Path) -> None:
+        """Test matplotlib rendering with isolated root nodes."""
+        if not _check_matplotlib():
+            return  # Skip if matplotlib not installed
+
+        output = tmp_path / "test.png"
+        result = _render_with_matplotlib(
+            frozenset(), frozenset({"isolated_pkg"}), output, "png", "Isolated"
+        )
+        assert result is True
+        assert output.exists()
+
+    def test_render_fallback_to_matplotlib(self, tmp_path: Path, render_src: Path) -> None:
+        """Test that cmd_graph falls back to matplotlib when graphviz unavailable."""
+        if not _check_matplotlib():
+            return  # Skip if matplotlib not installed
+
+        output_file = tmp_path / "fallback_test.png"
+        args = GraphArgs(
+            package="render_pkg",
+            output=str(output_file),
+            depth=1,
+            source=[str(render_src)],
+            render="png",
+        )
+
+        # Mock graphviz as unavailable, but matplotlib available
+        with mock.patch("rostree.cli._check_graphviz", return_value=False):
+            result = cmd_graph(args)
+            assert result == 0
+            assert output_file.exists()
+
+
+class TestCmdTui:
+    """Tests for cmd_tui function."""
+
+    __slots__ = ()
+
+    def test_cmd_tui_launch(self) -> None:
+        """Test TUI command launches app."""
+        from rostree.cli import cmd_tui
+
+        with mock.patch("rostree.tui.app.DepTreeApp") as mock_app:
+            mock_instance = mock.MagicMock()
+            mock_app.return_value = mock_instance
+            args = _DEFAULT_TUI
+            result = cmd_tui(args)
+            assert result == 0
+            mock_app.assert_called_once_with(root_package=None)
+            mock_instance.run.assert_called_once()
+
+    def test_cmd_tui_with_package(self) -> None:
+        """Test TUI command with package argument."""
+        from rostree.cli import cmd_tui
+
+        with mock.patch("rostree.tui.app.DepTreeApp") as mock_app:
+            mock_instance = mock.MagicMock()
+            mock_app.return_value = mock_instance
+            args = TuiArgs(package="rclpy")
+            result = cmd_tui(args)
+            assert result == 0
+            mock_app.assert_called_once_with(root_package="rclpy")
+
+
+class TestGetWorkspacePackages:
+    """Tests for _get_workspace_packages function."""
+
+    __slots__ = ()
+
+    def test_workspace_path_not_exists(self, tmp_path: Path) -> None:
+        """Test when workspace path doesn't exist."""
+
+        nonexistent = tmp_path / "nonexistent"
+        result = _get_workspace_packages(nonexistent)
+        assert result == []
+
+    def test_workspace_filters_system_packages(self) -> None:
+        """Test that system packages are filtered out."""
+
+        mock_packages = {
+            "Workspace": ["pkg1", "pkg2"],
+            "System": ["system_pkg"],
+            "Source": ["src_pkg"],
+        }
+        with mock.patch("rostree.cli.list_packages_by_source", return_value=mock_packages):
+            result = _get_workspace_packages(None)
+            assert "pkg1" in result
+            assert "pkg2" in result
+            assert "src_pkg" in result
+            assert "system_pkg" not in result
+
+
+class TestRenderDotErrors:
+    """Tests for _render_dot error handling."""
+
+    __slots__ = ()
+
+    def test_render_dot_graphviz_error(self, tmp_path: Path, capsys) -> None:
+        """Test render_dot when graphviz returns error."""
+        with mock.patch("rostree.cli.shutil.which", return_value="/usr/bin/dot"):
+            with mock.patch("rostree.cli.subprocess.run") as mock_run:
+                mock_run.return_value = mock.MagicMock(returncode=1, stderr="parse error")
+                result = _render_dot("invalid dot", tmp_path / "out.png", "png")
+                assert result is False
+                captured = capsys.readouterr()
+                assert "parse error" in captured.err
+
+    def test_render_dot_timeout(self, tmp_path: Path, capsys) -> None:
+        """Test render_dot when graphviz times out."""
+        import subprocess
+
+        with mock.patch("rostree.cli.shutil.which", return_value="/usr/bin/dot"):
+            with mock.patch("rostree.cli.subprocess.run") as mock_run:
+                mock_run.side_effect = subprocess.TimeoutExpired(cmd="dot", timeout=60)
+                result = _render_dot("digraph {}", tmp_path / "out.png", "png")
+                assert result is False
+                captured = capsys.readouterr()
+                assert "timed out" in captured.err.lower()
+
+    def test_render_dot_exception(self, tmp_path: Path, capsys) -> None:
+        """Test render_dot when exception occurs."""
+        with mock.patch("rostree.cli.shutil.which", return_value="/usr/bin/dot"):
+            with mock.patch("rostree.cli.subprocess.run") as mock_run:
+                mock_run.side_effect = Exception("Unexpected error")
+                result = _render_dot("digraph {}", tmp_path / "out.png", "png")
+                assert result is False
+                captured = capsys.readouterr()
+                assert "Unexpected error" in captured.err
+
+
+class TestOpenFile:
+    """Tests for _open_file function."""
+
+    __slots__ = ()
+
+    def test_open_file_linux(self, tmp_path: Path) -> None:
+        """Test opening file on Linux."""
+        from rostree.cli import _open_file
+
+        test_file = tmp_path / "test.png"
+        test_file.touch()
+
+        with mock.patch("platform.system", return_value="Linux"):
+            with mock.patch("subprocess.run") as mock_run:
+                mock_run.return_value = mock.MagicMock()
+                result = _open_file(test_file)
+                assert result is True
+                mock_run.assert_called_once()
+                assert "xdg-open" in str(mock_run.call_args)
+
+    def test_open_file_macos(self, tmp_path: Path) -> None:
+        """Test opening file on macOS."""
+        from rostree.cli import _open_file
+
+        test_file = tmp_path / "test.png"
+        test_file.touch()
+
+        with mock.patch("platform.system", return_value="Darwin"):
+            with mock.patch("subprocess.run") as mock_run:
+                mock_run.return_value = mock.MagicMock()
+                result = _open_file(test_file)
+                assert result is True
+                mock_run.assert_called_once()
+                assert "open" in str(mock_run.call_args)
+
+    def test_open_file_windows(self, tmp_path: Path) -> None:
+        """Test opening file on Windows."""
+        from rostree.cli import _open_file
+
+        test_file = tmp_path / "test.png"
+        test_file.touch()
+
+        with mock.patch("platform.system", return_value="Windows"):
+            with mock.patch("subprocess.run") as mock_run:
+                mock_run.return_value = mock.MagicMock()
+                result = _open_file(test_file)
+                assert result is True
+                mock_run.assert_called_once()
+                assert "start" in str(mock_run.call_args)
+
+    def test_open_file_error(self, tmp_path: Path, capsys) -> None:
+        """Test opening file when error occurs."""
+        from rostree.cli import _open_file
+
+        test_file = tmp_path / "test.png"
+        test_file.touch()
+
+        with mock.patch("platform.system", return_value="Linux"):
+            with mock.patch("subprocess.run") as mock_run:
+                mock_run.side_effect = Exception("Cannot open")
+                result = _open_file(test_file)
+                assert result is False
+                captured = capsys.readouterr()
+                assert "Cannot open" in captured.err
+
+
+class TestCmdGraphEdgeCases:
+    """Additional edge case tests for cmd_graph."""
+
+    __slots__ = ()
+
+    def test_graph_package_limit_warning(self, tmp_path: Path, capsys) -> None:
+        """Test warning when too many packages."""
+        # Create more packages than the limit
+        many_packages = [f"pkg{i}" for i in range(60)]
+
+        with mock.patch("rostree.cli._get_workspace_packages", return_value=many_packages):
+            with mock.patch("rostree.cli.build_dependency_tree") as mock_build:
+                mock_build.return_value = DependencyNode(
+                    name="pkg0", version="1.0", description="", path="/p"
+                )
+                args = _DEFAULT_GRAPH
+                cmd_graph(args)
+                captured = capsys.readouterr()
+                assert "Limiting to first 50" in captured.err
+
+    def test_graph_no_valid_trees(self, tmp_path: Path, capsys) -> None:
+        """Test when no valid trees can be built."""
+        with mock.patch("rostree.cli._get_workspace_packages", return_value=["pkg1"]):
+            with mock.patch("rostree.cli.build_dependency_tree", return_value=None):
+                args = _DEFAULT_GRAPH
+                result = cmd_graph(args)
+                assert result == 1
+                captured = capsys.readouterr()
+                assert "No valid package trees" in captured.err
+
+    def test_graph_workspace_title(self, tmp_path: Path, capsys) -> None:
+        """Test workspace-wide graph title generation."""
+        tree = DependencyNode(name="pkg1", version="1.0", description="", path="/p")
+
+        with mock.patch("rostree.cli._get_workspace_packages", return_value=["pkg1"]):
+            with mock.patch("rostree.cli.build_dependency_tree", return_value=tree):
+                args = _DEFAULT_GRAPH
+                result = cmd_graph(args)
+                assert result == 0
+                captured = capsys.readouterr()
+                assert "Workspace dependencies" in captured.out
+
+    def test_graph_render_output_path_handling(self, tmp_path: Path) -> None:
+        """Test output path handling when rendering."""
+        tree = DependencyNode(name="test_pkg", version="1.0", description="", path="/p")
+
+        with mock.patch("rostree.cli.build_dependency_tree", return_value=tree):
+            with mock.patch("rostree.cli._check_graphviz", return_value=True):
+                with mock.patch("rostree.cli._render_dot", return_value=True) as mock_render:
+                    # Test with output path that needs extension change (use .txt, not .dot)
+                    args = GraphArgs(
+                        package="test_pkg",
+                        output=str(tmp_path / "out.txt"),
+                        depth=1,
+                        render="png",
+                    )
+                    result = cmd_graph(args)
+                    assert result == 0
+                    # Check that extension was changed to .png
+                    call_args = mock_render.call_args[0]
+                    assert str(call_args[1]).endswith(".png")
+
+    def test_graph_render_default_filename(self, tmp_path: Path) -> None:
+        """Test default filename generation for render."""
+        tree = DependencyNode(name="test_pkg", version="1.0", description="", path="/p")
+
+        with mock.patch("rostree.cli.build_dependency_tree", return_value=tree):
+            with mock.patch("rostree.cli._check_graphviz", return_value=True):
+                with mock.patch("rostree.cli._render_dot", return_value=True) as mock_render:
+                    # Test with workspace (no package, no output path)
+                    args = GraphArgs(workspace=str(tmp_path / "my_ws"), depth=1, render="svg")
+                    with mock.patch("rostree.cli._get_workspace_packages", return_value=["pkg1"]):
+                        result = cmd_graph(args)
+                        assert result == 0
+                        call_args = mock_render.call_args[0]
+                        # Should use workspace name as base
+                        assert "my_ws" in str(call_args[1])
+
+    def test_graph_no_rendering_backend(self, tmp_path: Path, capsys) -> None:
+        """Test error when no rendering backend available."""
+        tree = DependencyNode(name="pkg", version="1.0", description="", path="/p")
+
+        with mock.patch("rostree.cli.build_dependency_tree", return_value=tree):
+            with mock.patch("rostree.cli._check_graphviz", return_value=False):
+                with mock.patch("rostree.cli._check_matplotlib", return_value=False):
+                    args = GraphArgs(package="pkg", depth=1, render="png")
+                    result = cmd_graph(args)
+                    assert result == 1
+                    captured = capsys.readouterr()
+                    assert "No rendering backend" in captured.err
+
+    def test_graph_matplotlib_fallback_reuses_edges(self, tmp_path: Path) -> None:
+        """Test the matplotlib fallback reuses the edges collected for the DOT text."""
+        child = DependencyNode(name="dep", version="1.0", description="", path="/d")
+        tree = DependencyNode(
+            name="pkg", version="1.0", description="", path="/p", children=[child]
+        )
+
+        with mock.patch("rostree.cli.build_dependency_tree", return_value=tree):
+            with mock.patch("rostree.cli._check_graphviz", return_value=False):
+                with mock.patch("rostree.cli._check_matplotlib", return_value=True):
+                    with mock.patch("rostree.cli._graph_edges", wraps=_graph_edges) as spy:
+                        with mock.patch(
+                            "rostree.cli._render_with_matplotlib", return_value=True
+                        ) as mock_render:
+                            args = GraphArgs(
+                                package="pkg",
+                                output=str(tmp_path / "out.png"),
+                                depth=1,
+                                render="png",
+                            )
+                            result = cmd_graph(args)
+        assert result == 0
+        assert spy.call_count == 1
+        assert mock_render.call_args[0][:2] == ({"pkg": ["dep"]}, {"pkg"})
+
+    def test_graph_render_failed(self, tmp_path: Path) -> None:
+        """Test when rendering fails."""
+        tree = DependencyNode(name="pkg", version="1.0", description="", path="/p")
+
+        with mock.patch("rostree.cli.build_dependency_tree", return_value=tree):
+            with mock.patch("rostree.cli._check_graphviz", return_value=True):
+                with mock.patch("rostree.cli._render_dot", return_value=False):
+                    args = GraphArgs(package="pkg", depth=1, render="png")
+                    result = cmd_graph(args)
+                    assert result == 1
+
+    def test_graph_render_with_open(self, tmp_path: Path) -> None:
+        """Test render with --open flag."""
+        tree = DependencyNode(name="pkg", version="1.0", description="", path="/p")
+
+        with mock.patch("rostree.cli.build_dependency_tree", return_value=tree):
+            with mock.patch("rostree.cli._check_graphviz", return_value=True):
+                with mock.patch("rostree.cli._render_dot", return_value=True):
+                    with mock.patch("rostree.cli._open_file") as mock_open:
+                        args = GraphArgs(
+                            package="pkg",
+                            output=str(tmp_path / "out.png"),
+                            depth=1,
+                            render="png",
+                            open=True,
+                        )
+                        result = cmd_graph(args)
+                        assert result == 0
+                        mock_open.assert_called_once()
+
+    def test_graph_progress_output(self, tmp_path: Path, capsys) -> None:
+        """Test progress output for multiple packages."""
+        trees = [
+            DependencyNode(name=f"pkg{i}", version="1.0", description="", path="/p")
+            for i in range(3)
+        ]
+
+        with mock.patch(
+            "rostree.cli._get_workspace_packages", return_value=["pkg0", "pkg1", "pkg2"]
+        ):
+            with mock.patch("rostree.cli.build_dependency_tree", side_effect=trees):
+                args = GraphArgs(depth=2)
+                result = cmd_graph(args)
+                assert result == 0
+                captured = capsys.readouterr()
+                assert "Processing pkg0 (1/3)" in captured.err
+                assert "Processing pkg1 (2/3)" in captured.err
+
+
+@contextlib.contextmanager
+def _patched_handler(command: str) -> Iterator[mock.Mock]:
+    """Swap the handler main() dispatches to for a subcommand on the cached parser."""
+    sub = subcommand_parser(_get_parser(), command)
+    original = sub.get_default("func")
+    handler = mock.Mock(return_value=0)
+    sub.set_defaults(func=handler)
+    try:
+        yield handler
+    finally:
+        sub.set_defaults(func=original)
+
+
+class TestMainFunction:
+    """Tests for main() function."""
+
+    __slots__ = ()
+
+    def test_main_default_tui(self) -> None:
+        """Test main defaults to TUI when no command."""
+        with mock.patch("rostree.cli.cmd_tui") as mock_tui:
+            mock_tui.return_value = 0
+            result = main([])
+            assert result == 0
+            mock_tui.assert_called_once()
+
+    def test_main_tree_command(self) -> None:
+        """Test main with tree command."""
+        with _patched_handler("tree") as mock_tree:
+            result = main(["tree", "rclpy"])
+            assert result == 0
+            mock_tree.assert_called_once()
+
+    def test_main_entry_point(self) -> None:
+        """Test main as entry point."""
+        with mock.patch("rostree.cli.cmd_tui") as mock_tui:
+            mock_tui.return_value = 0
+            with mock.patch("sys.argv", ["rostree"]):
+                # This tests the if __name__ == "__main__" path indirectly
+                result = main([])
+                assert result == 0
+
+
+class TestMatplotlibRenderingEdgeCases:
+    """Additional edge case tests for matplotlib rendering."""
+
+    __slots__ = ()
+
+    def test_render_matplotlib_import_error(self, tmp_path: Path, capsys, sample_edges) -> None:
+        """Test matplotlib rendering when import fails."""
+        # This tests the inner ImportError in _render_with_matplotlib
+        edges, root_names = sample_edges
+        output = tmp_path / "test.png"
+
+        # Mock the import to raise ImportError
+        import builtins
+
+        original_import = builtins.__import__
+
+        def mock_import(name, *args, **kwargs):
+            if "matplotlib" in name:
+                raise ImportError("No module named matplotlib")
+            return original_import(name, *args, **kwargs)
+
+        with mock.patch.object(builtins, "__import__", side_effect=mock_import):
+            result = _render_with_matplotlib(edges, root_names, output, "png", None)
+            # Should fail gracefully
+            assert result is False
+            captured = capsys.readouterr()
+            assert "matplotlib" in captured.err.lower()
+
+    def test_render_matplotlib_exception(self, tmp_path: Path, capsys, sample_edges) -> None:
+        """Test matplotlib rendering when exception occurs."""
+        if not _check_matplotlib():
+            return  # Skip if matplotlib not installed
+
+        edges, root_names = sample_edges
+        output = tmp_path / "test.png"
+
+        with mock.patch("networkx.DiGraph") as mock_digraph:
+            mock_digraph.side_effect = Exception("Graph creation failed")
+            result = _render_with_matplotlib(edges, root_names, output, "png", None)
+            assert result is False
+            captured = capsys.readouterr()
+            assert "Error rendering" in captured.err
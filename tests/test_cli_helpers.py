@@ -0,0 +1,307 @@
+"""Tests for rostree CLI helpers that do no filesystem I/O (tree text, graph output, parser)."""
+
+import argparse
+import json
+from unittest import mock
+
+import pytest
+
+from rostree.cli import (
+    _get_parser,
+    _print_tree_text,
+    _generate_dot,
+    _generate_mermaid,
+    _collect_edges,
+    _collect_edges_multi,
+    _edges_to_adjacency,
+    _json_dumps,
+    _mermaid_id,
+)
+from rostree.core.tree import DependencyNode
+from tests.cli_args import subcommand_parser
+
+
+@pytest.fixture(scope="module")
+def tree_nodes() -> dict[str, DependencyNode]:
+    """Nodes for the _print_tree_text tests, built once (the printer only reads them)."""
+    return {
+        "simple": DependencyNode(
+            name="test_pkg", version="1.0.0", description="Test package", path="/path"
+        ),
+        "parent": DependencyNode(
+            name="parent",
+            version="2.0",
+            description="Parent pkg",
+            path="/parent",
+            children=[
+                DependencyNode(name="child", version="0.5", description="Child pkg", path="/child")
+            ],
+        ),
+        "missing": DependencyNode(name="missing", version="", description="(not found)", path=""),
+        "cyclic": DependencyNode(name="cyclic", version="", description="(cycle)", path=""),
+        "bad": DependencyNode(name="bad", version="", description="(parse error)", path="/bad"),
+    }
+
+
+class TestPrintTreeText:
+    """Tests for _print_tree_text helper."""
+
+    __slots__ = ()
+
+    @pytest.mark.parametrize(
+        ("key", "expected"),
+        [
+            ("simple", ("test_pkg", "1.0.0", "Test package")),
+            ("parent", ("parent", "child")),
+            ("missing", ("missing", "(not found)")),
+            ("cyclic", ("cyclic", "(cycle)")),
+            ("bad", ("(parse error)",)),
+        ],
+        ids=["simple", "with_children", "not_found", "cycle", "parse_error"],
+    )
+    def test_node_output(
+        self,
+        capsys,
+        tree_nodes: dict[str, DependencyNode],
+        key: str,
+        expected: tuple[str, ...],
+    ) -> None:
+        _print_tree_text(tree_nodes[key])
+        out = capsys.readouterr().out
+        for text in expected:
+            assert text in out
+
+
+@pytest.fixture(scope="session")
+def parser() -> argparse.ArgumentParser:
+    """The process-wide cached CLI parser (the same instance main() uses)."""
+    return _get_parser()
+
+
+@pytest.fixture(scope="session")
+def help_outputs(parser: argparse.ArgumentParser) -> dict[str, str]:
+    """Help text for the top-level parser ("") and each subcommand, formatted once."""
+    cli_parser = parser
+    outputs = {"": cli_parser.format_help()}
+    for name in ("scan", "list", "tree", "graph"):
+        outputs[name] = subcommand_parser(cli_parser, name).format_help()
+    return outputs
+
+
+class TestMainHelp:
+    """Tests for the CLI parser's help and version output."""
+
+    __slots__ = ()
+
+    def test_version(self, parser: argparse.ArgumentParser, capsys) -> None:
+        with pytest.raises(SystemExit) as exc_info:
+            parser.parse_args(["--version"])
+        assert exc_info.value.code == 0
+        captured = capsys.readouterr()
+        # Version is dynamic from package metadata (or fallback when not installed)
+        assert "rostree" in captured.out
+        # Should contain a version pattern (X.Y.Z or 0.0.0+unknown for dev)
+        import re
+
+        assert re.search(r"\d+\.\d+\.\d+", captured.out)
+
+    @pytest.mark.parametrize(
+        ("command", "expected"),
+        [
+            ("", ("rostree", "scan", "list", "tree", "tui")),
+            ("scan", ("scan", "--depth")),
+            ("list", ("list", "--by-source")),
+            ("tree", ("tree", "--runtime")),
+            ("graph", ("graph", "--format", "--workspace")),
+        ],
+        ids=["top_level", "scan", "list", "tree", "graph"],
+    )
+    def test_help(
+        self, help_outputs: dict[str, str], command: str, expected: tuple[str, ...]
+    ) -> None:
+        output = help_outputs[command]
+        for text in expected:
+            assert text in output
+
+
+# Shared, never-mutated nodes for the graph helper tests (the helpers only read them).
+_SINGLE = DependencyNode(name="test", version="1.0", description="", path="")
+_CHILD = DependencyNode(name="child", version="1.0", description="", path="")
+_PARENT_OF_CHILD = DependencyNode(
+    name="parent", version="1.0", description="", path="", children=[_CHILD]
+)
+_CYCLE = DependencyNode(name="cyclic", version="", description="(cycle)", path="")
+_PARENT_OF_CYCLE = DependencyNode(
+    name="parent", version="1.0", description="", path="", children=[_CYCLE]
+)
+_MISSING = DependencyNode(name="missing", version="", description="(not found)", path="")
+_PARENT_OF_MISSING = DependencyNode(
+    name="parent", version="1.0", description="", path="", children=[_MISSING]
+)
+
+
+def _graph_outputs(generate) -> dict[str, str]:
+    """Render the shared single-node, parent/child and titled graph shapes once."""
+    return {
+        "single": generate([_SINGLE]),
+        "edges": generate([_PARENT_OF_CHILD]),
+        "titled": generate([_SINGLE], title="My Graph"),
+    }
+
+
+@pytest.fixture(scope="module")
+def dot_outputs() -> dict[str, str]:
+    return _graph_outputs(_generate_dot)
+
+
+@pytest.fixture(scope="module")
+def mermaid_outputs() -> dict[str, str]:
+    return _graph_outputs(_generate_mermaid)
+
+
+class TestGraphHelpers:
+    """Tests for graph generation helper functions."""
+
+    __slots__ = ()
+
+    def test_collect_edges_simple(self) -> None:
+        edges: set[tuple[str, str]] = set()
+        _collect_edges(_PARENT_OF_CHILD, edges)
+        assert ("parent", "child") in edges
+
+    def test_collect_edges_skips_cycle(self) -> None:
+        edges: set[tuple[str, str]] = set()
+        _collect_edges(_PARENT_OF_CYCLE, edges)
+        # Should not include edge to cycle node
+        assert ("parent", "cyclic") not in edges
+
+    def test_collect_edges_skips_not_found(self) -> None:
+        edges: set[tuple[str, str]] = set()
+        _collect_edges(_PARENT_OF_MISSING, edges)
+        assert ("parent", "missing") not in edges
+
+    def test_edges_to_adjacency_groups_children(self) -> None:
+        edges = {("b", "c"), ("a", "c"), ("a", "b")}
+        adj = _edges_to_adjacency(edges)
+        assert adj == {"a": ["b", "c"], "b": ["c"]}
+        # Shared child names are interned to a single object
+        assert adj["a"][1] is adj["b"][0]
+
+    def test_mermaid_id_replaces_dash(self) -> None:
+        assert _mermaid_id("my-package") == "my_package"
+
+    def test_mermaid_id_replaces_dot(self) -> None:
+        assert _mermaid_id("pkg.name") == "pkg_name"
+
+    def test_generate_dot_single_node(self, dot_outputs: dict[str, str]) -> None:
+        output = dot_outputs["single"]
+        assert "digraph dependencies" in output
+        assert '"test"' in output
+        assert "fillcolor=lightblue" in output
+
+    def test_generate_dot_with_edges(self, dot_outputs: dict[str, str]) -> None:
+        assert '"parent" -> "child"' in dot_outputs["edges"]
+
+    def test_generate_dot_with_title(self, dot_outputs: dict[str, str]) -> None:
+        assert 'label="My Graph"' in dot_outputs["titled"]
+
+    def test_generate_mermaid_single_node(self, mermaid_outputs: dict[str, str]) -> None:
+        output = mermaid_outputs["single"]
+        assert "graph LR" in output
+        assert "test[test]" in output
+
+    def test_generate_mermaid_with_edges(self, mermaid_outputs: dict[str, str]) -> None:
+        assert "parent --> child" in mermaid_outputs["edges"]
+
+    def test_generate_mermaid_with_title(self, mermaid_outputs: dict[str, str]) -> None:
+        assert "title: My Graph" in mermaid_outputs["titled"]
+
+
+class TestCollectEdgesWithCycles:
+    """Tests for _collect_edges with cycles."""
+
+    __slots__ = ()
+
+    def test_collect_edges_cycle_handling(self) -> None:
+        """Test that cycles are handled correctly."""
+        # Create a cycle: A -> B -> A (cycle marker)
+        cycle_marker = DependencyNode(name="A", version="1.0", description="(cycle)", path="/path")
+        node_b = DependencyNode(
+            name="B", version="1.0", description="B pkg", path="/path", children=[cycle_marker]
+        )
+        node_a = DependencyNode(
+            name="A", version="1.0", description="A pkg", path="/path", children=[node_b]
+        )
+
+        edges: set[tuple[str, str]] = set()
+        _collect_edges(node_a, edges)
+
+        # Should only have A -> B edge, not B -> A (cycle marker skipped)
+        assert ("A", "B") in edges
+        assert ("B", "A") not in edges
+
+    def test_collect_edges_already_visited(self) -> None:
+        """Test that already visited nodes are skipped."""
+        child = DependencyNode(name="C", version="1.0", description="C", path="/p")
+        node_a = DependencyNode(
+            name="A", version="1.0", description="A", path="/p", children=[child]
+        )
+
+        edges: set[tuple[str, str]] = set()
+        visited: set[str] = {"A"}  # Pre-mark A as visited
+        _collect_edges(node_a, edges, visited)
+
+        # No edges should be collected since A was already visited
+        assert len(edges) == 0
+
+
+class TestCollectEdgesMulti:
+    """Tests for _collect_edges_multi function."""
+
+    __slots__ = ()
+
+    def test_collect_edges_multi(self) -> None:
+        """Test collecting edges from multiple trees."""
+
+        child1 = DependencyNode(name="dep1", version="1.0", description="D1", path="/p")
+        tree1 = DependencyNode(
+            name="A", version="1.0", description="A", path="/p", children=[child1]
+        )
+
+        child2 = DependencyNode(name="dep2", version="1.0", description="D2", path="/p")
+        tree2 = DependencyNode(
+            name="B", version="1.0", description="B", path="/p", children=[child2]
+        )
+
+        root_names = {"A", "B"}
+        edges, all_nodes = _collect_edges_multi([tree1, tree2], root_names)
+
+        assert ("A", "dep1") in edges
+        assert ("B", "dep2") in edges
+        assert "A" in all_nodes
+        assert "B" in all_nodes
+        assert "dep1" in all_nodes
+        assert "dep2" in all_nodes
+
+
+class TestJsonDumps:
+    """Tests for _json_dumps helper."""
+
+    __slots__ = ()
+
+    def test_matches_stdlib_indent(self) -> None:
+        data = {"name": "pkg", "children": [{"name": "dep", "children": []}], "valid": True}
+        assert json.loads(_json_dumps(data)) == data
+        assert _json_dumps(data).splitlines()[1] == b'  "name": "pkg",'
+
+    def test_stdlib_fallback(self) -> None:
+        data = [{"path": "/ws", "packages": ["a", "b"]}]
+        with mock.patch("rostree.cli.orjson", None):
+            assert _json_dumps(data) == json.dumps(data, indent=2).encode()
+
+    def test_non_ascii_same_with_and_without_orjson(self) -> None:
+        data = {"description": "Paquet de démonstration ✓", "children": [], "path": "/ws/ü"}
+        with mock.patch("rostree.cli.orjson", None):
+            fallback = _json_dumps(data)
+        assert "démonstration ✓".encode() in fallback
+        assert _json_dumps(data) == fallback
@@ -6,21 +6,29 @@ import os
 from pathlib import Path
 from unittest import mock
 
+import pytest
 
+import rostree.core.finder
 from rostree.core.finder import (
     WorkspaceInfo,
     scan_for_workspaces,
+    clear_prefix_cache,
     find_package_path,
     list_package_paths,
     list_packages_by_source,
+    package_resolver,
     _env_paths,
+    _paths_from_env_value,
     _find_package_xml_in_prefix,
     _find_package_xml_in_src,
     _gather_workspace_src_roots,
+    _read_package_name,
     _is_system_prefix,
     _workspace_root_from_prefix,
     _list_packages_in_src,
     _list_packages_in_install,
+    _package_names_in_trees,
+    _iter_manifests,
 )
 
 
@@ -55,6 +63,12 @@ class TestWorkspaceInfo:
         assert d["packages"] == ["pkg_a", "pkg_b"]
         assert d["is_valid"] is True
 
+    def test_slotted(self) -> None:
+        ws = WorkspaceInfo(path=Path("/test/ws"))
+        assert not hasattr(ws, "__dict__")
+        with pytest.raises(AttributeError):
+            ws.unknown = 1  # type: ignore[attr-defined]
+
 
 class TestEnvPaths:
     """Tests for _env_paths helper."""
@@ -76,6 +90,18 @@ class TestEnvPaths:
             assert len(result) == 1
             assert result[0] == existing.resolve()
 
+    def test_from_value_without_env(self, tmp_path: Path) -> None:
+        value = f"{tmp_path}{os.pathsep}{tmp_path / 'missing'}"
+        assert _paths_from_env_value(value) == [tmp_path.resolve()]
+        assert _paths_from_env_value("") == []
+
+    def test_skips_files_and_blank_entries(self, tmp_path: Path) -> None:
+        a_file = tmp_path / "setup.bash"
+        a_file.write_text("")
+        value = os.pathsep.join([str(a_file), " ", str(tmp_path)])
+        with mock.patch.dict(os.environ, {"TEST_PATH": value}, clear=False):
+            assert _env_paths("TEST_PATH") == [tmp_path.resolve()]
+
 
 class TestFindPackageXmlInPrefix:
     """Tests for _find_package_xml_in_prefix."""
@@ -94,6 +120,11 @@ class TestFindPackageXmlInPrefix:
         result = _find_package_xml_in_prefix(tmp_path, "nonexistent")
         assert result is None
 
+    def test_manifest_directory_ignored(self, tmp_path: Path) -> None:
+        (tmp_path / "share" / "my_pkg" / "package.xml").mkdir(parents=True)
+
+        assert _find_package_xml_in_prefix(tmp_path, "my_pkg") is None
+
 
 class TestFindPackageXmlInSrc:
     """Tests for _find_package_xml_in_src."""
@@ -121,6 +152,41 @@ class TestFindPackageXmlInSrc:
         result = _find_package_xml_in_src(tmp_path, "my_pkg")
         assert result is None
 
+    def test_stops_at_first_match(self, tmp_path: Path) -> None:
+        for name in ("pkg_a", "pkg_b", "pkg_c"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "package.xml").write_text("<package><name>dup</name></package>")
+
+        with mock.patch("rostree.core.finder._read_package_name", return_value="dup") as read_name:
+            result = _find_package_xml_in_src(tmp_path, "dup")
+        assert result is not None
+        assert read_name.call_count == 1
+
+    def test_skips_manifests_without_the_name(self, tmp_path: Path) -> None:
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "package.xml").write_text("<package><name>other</name></package>")
+
+        with mock.patch("rostree.core.finder._HEAD_NAME_RE") as head_re:
+            assert _find_package_xml_in_src(tmp_path, "target") is None
+        head_re.match.assert_not_called()
+
+    def test_expected_name_prescan(self, tmp_path: Path) -> None:
+        small = tmp_path / "small.xml"
+        small.write_text("<package><name>other</name></package>")
+        assert _read_package_name(small, "target") is None
+        assert _read_package_name(small, "other") == "other"
+
+        # An entity could spell the name, so such files are still parsed
+        escaped = tmp_path / "escaped.xml"
+        escaped.write_text("<package><name>t&#97;rget</name></package>")
+        assert _read_package_name(escaped, "target") == "target"
+
+        large = tmp_path / "large.xml"
+        comment = "<!--" + "x" * 8192 + "-->"
+        large.write_text(f"{comment}<package><name>other</name></package>")
+        assert _read_package_name(large, "target") is None
+        assert _read_package_name(large, "other") == "other"
+
 
 class TestGatherWorkspaceSrcRoots:
     """Tests for _gather_workspace_src_roots."""
@@ -163,6 +229,28 @@ class TestGatherWorkspaceSrcRoots:
             # Should only appear once
             assert result.count(src.resolve()) == 1
 
+    def test_deduplicates_symlinks_in_order(self, tmp_path: Path) -> None:
+        a = tmp_path / "a"
+        b = tmp_path / "b"
+        a.mkdir()
+        b.mkdir()
+        link = tmp_path / "link_to_a"
+        link.symlink_to(a)
+
+        with mock.patch.dict(
+            os.environ,
+            {
+                "COLCON_PREFIX_PATH": "",
+                "AMENT_PREFIX_PATH": "",
+                "ROS2_WORKSPACE": "",
+                "COLCON_WORKSPACE": "",
+            },
+            clear=False,
+        ):
+            result = _gather_workspace_src_roots(extra_source_roots=[b, link, a])
+            assert result[-2:] == [b.resolve(), a.resolve()]
+            assert result.count(a.resolve()) == 1
+
 
 class TestIsSystemPrefix:
     """Tests for _is_system_prefix."""
@@ -175,6 +263,19 @@ class TestIsSystemPrefix:
         assert _is_system_prefix(Path("/home/user/ros_ws/install")) is False
         assert _is_system_prefix(Path("/tmp/ws")) is False
 
+    def test_prefix_match_only(self) -> None:
+        assert _is_system_prefix(Path("/opt/ros")) is True
+        assert _is_system_prefix(Path("/opt/rosetta/install")) is False
+        assert _is_system_prefix(Path("/home/user/opt/ros/humble")) is False
+
+    def test_memoized_per_path_string(self) -> None:
+        clear_prefix_cache()
+        with mock.patch("rostree.core.finder.os.path.realpath", wraps=os.path.realpath) as realpath:
+            for _ in range(3):
+                assert _is_system_prefix(Path("/opt/ros/humble")) is True
+                assert _workspace_root_from_prefix(Path("/ws/install")) == Path("/ws")
+        assert realpath.call_count == 2
+
 
 class TestWorkspaceRootFromPrefix:
     """Tests for _workspace_root_from_prefix."""
@@ -219,6 +320,156 @@ class TestListPackagesInSrc:
         result = _list_packages_in_src(tmp_path)
         assert result == []
 
+    def test_name_split_across_lines(self, tmp_path: Path) -> None:
+        pkg_dir = tmp_path / "multi"
+        pkg_dir.mkdir()
+        (pkg_dir / "package.xml").write_text(
+            "<package format='3'>\n  <name>\n    multi_pkg\n  </name>\n</package>"
+        )
+
+        assert _list_packages_in_src(tmp_path) == ["multi_pkg"]
+
+    def test_conforming_manifest_skips_xml_parser(self, tmp_path: Path) -> None:
+        pkg_dir = tmp_path / "std"
+        pkg_dir.mkdir()
+        (pkg_dir / "package.xml").write_text(
+            '<?xml version="1.0"?>\n'
+            '<?xml-model href="http://download.ros.org/schema/package_format3.xsd"?>\n'
+            '<package format="3">\n  <!-- comment -->\n  <name>std_pkg</name>\n</package>\n'
+        )
+
+        with mock.patch("rostree.core.finder.ET.XMLParser") as mock_parser:
+            assert _list_packages_in_src(tmp_path) == ["std_pkg"]
+        mock_parser.assert_not_called()
+
+    def test_stops_after_top_level_name(self, tmp_path: Path) -> None:
+        pkg_dir = tmp_path / "early"
+        pkg_dir.mkdir()
+        # Only the top-level <name> counts; the malformed tail after it is never reached
+        (pkg_dir / "package.xml").write_text(
+            "<package><export><name>nested</name></export><name>early_pkg</name><<<x>"
+        )
+
+        assert _list_packages_in_src(tmp_path) == ["early_pkg"]
+
+    def test_name_after_other_elements_spanning_chunks(self, tmp_path: Path) -> None:
+        pkg_dir = tmp_path / "late"
+        pkg_dir.mkdir()
+        # Not the first child, and past the first read chunk: read by the target parser
+        long_text = "words " * 2000
+        (pkg_dir / "package.xml").write_text(
+            f"<package><description>{long_text}</description>"
+            "<name> late_&amp;_pkg </name><version>1.0.0</version></package>"
+        )
+
+        assert _list_packages_in_src(tmp_path) == ["late_&_pkg"]
+
+    def test_comments_before_late_name_do_not_backtrack(self, tmp_path: Path) -> None:
+        pkg_dir = tmp_path / "commented"
+        pkg_dir.mkdir()
+        # Each extra comment used to double the failed head match's run time; with this many
+        # a backtracking pattern would never finish
+        comments = "".join(f"<!-- comment {i} -->\n" for i in range(60))
+        manifest = f"<package>{comments}<version>1</version><name>commented_pkg</name></package>"
+        (pkg_dir / "package.xml").write_text(manifest)
+
+        assert rostree.core.finder._HEAD_NAME_RE.match(manifest.encode()) is None
+        assert _list_packages_in_src(tmp_path) == ["commented_pkg"]
+
+    def test_comment_does_not_reach_nested_name(self, tmp_path: Path) -> None:
+        pkg_dir = tmp_path / "nested"
+        pkg_dir.mkdir()
+        (pkg_dir / "package.xml").write_text(
+            "<package><!-- c1 --><version>1</version>"
+            "<export><!-- c2 --><name>inner</name></export><name>real</name></package>"
+        )
+
+        assert _list_packages_in_src(tmp_path) == ["real"]
+
+    def test_long_leading_comment_skips_xml_parser(self, tmp_path: Path) -> None:
+        pkg_dir = tmp_path / "licensed"
+        pkg_dir.mkdir()
+        license_text = "Licensed under the Apache License.\n" * 400
+        (pkg_dir / "package.xml").write_text(
+            f'<?xml version="1.0"?>\n<!--\n{license_text}-->\n'
+            '<package format="3">\n  <name>licensed_pkg</name>\n</package>\n'
+        )
+
+        with mock.patch("rostree.core.finder.ET.XMLParser") as mock_parser:
+            assert _list_packages_in_src(tmp_path) == ["licensed_pkg"]
+        mock_parser.assert_not_called()
+
+
+class TestIterManifests:
+    """Tests for the colcon-style source walker behind _list_packages_in_src."""
+
+    @staticmethod
+    def _pkg(path: Path, name: str) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "package.xml").write_text(f"<package><name>{name}</name></package>")
+
+    def test_does_not_descend_into_packages(self, tmp_path: Path) -> None:
+        self._pkg(tmp_path / "outer", "outer_pkg")
+        self._pkg(tmp_path / "outer" / "test" / "fixture", "fixture_pkg")
+
+        assert _list_packages_in_src(tmp_path) == ["outer_pkg"]
+
+    @pytest.mark.parametrize("marker", ["COLCON_IGNORE", "AMENT_IGNORE", "CATKIN_IGNORE"])
+    def test_ignore_markers(self, tmp_path: Path, marker: str) -> None:
+        self._pkg(tmp_path / "kept", "kept_pkg")
+        self._pkg(tmp_path / "vendor" / "skipped", "skipped_pkg")
+        (tmp_path / "vendor" / marker).write_text("")
+
+        assert _list_packages_in_src(tmp_path) == ["kept_pkg"]
+
+    def test_skips_build_output_and_hidden_dirs(self, tmp_path: Path) -> None:
+        self._pkg(tmp_path / "real", "real_pkg")
+        for name in ("build", "install", "log", ".git"):
+            self._pkg(tmp_path / name / "copy", f"{name.strip('.')}_copy")
+
+        assert _list_packages_in_src(tmp_path) == ["real_pkg"]
+
+    def test_order_matches_depth_first_listing(self, tmp_path: Path) -> None:
+        for group in ("g1", "g2"):
+            for name in ("a", "b"):
+                self._pkg(tmp_path / group / name, f"{group}_{name}")
+
+        found = [Path(p).parent.relative_to(tmp_path) for p in _iter_manifests(tmp_path)]
+        groups = [p.parts[0] for p in found]
+        # Each group's packages come out together, as os.walk's pre-order would give
+        assert groups == sorted(groups, key=groups.index)
+        assert len(found) == 4
+
+
+class TestPackageNamesInTrees:
+    """Tests for _package_names_in_trees."""
+
+    def test_results_stay_with_their_tree(self, tmp_path: Path) -> None:
+        trees = []
+        for t in range(3):
+            src = tmp_path / f"ws{t}" / "src"
+            for i in range(t + 1):
+                (src / f"p{t}_{i}").mkdir(parents=True)
+                (src / f"p{t}_{i}" / "package.xml").write_text(
+                    f"<package><name>p{t}_{i}</name></package>"
+                )
+            trees.append(src)
+        # An unreadable manifest in the first tree must not shift later names
+        (trees[0] / "broken").mkdir()
+        (trees[0] / "broken" / "package.xml").write_text("<package><name>")
+
+        result = _package_names_in_trees(trees)
+        assert [sorted(name for name, _ in pkgs) for pkgs in result] == [
+            ["p0_0"],
+            ["p1_0", "p1_1"],
+            ["p2_0", "p2_1", "p2_2"],
+        ]
+        for src, pkgs in zip(trees, result):
+            assert all(pkg_xml.is_relative_to(src) for _, pkg_xml in pkgs)
+
+    def test_no_trees(self) -> None:
+        assert _package_names_in_trees([]) == []
+
 
 class TestListPackagesInInstall:
     """Tests for _list_packages_in_install."""
@@ -238,6 +489,25 @@ class TestListPackagesInInstall:
         result = _list_packages_in_install(tmp_path)
         assert result == []
 
+    def test_skips_files_and_dirs_without_manifest(self, tmp_path: Path) -> None:
+        share = tmp_path / "share"
+        (share / "not_a_pkg").mkdir(parents=True)
+        (share / "stray.txt").write_text("x")
+        (share / "real_pkg").mkdir()
+        (share / "real_pkg" / "package.xml").write_text("<package><name>real_pkg</name></package>")
+
+        assert _list_packages_in_install(tmp_path) == ["real_pkg"]
+
+    @pytest.mark.parametrize("use_dir_fd", [True, False])
+    def test_manifest_must_be_a_file(self, tmp_path: Path, use_dir_fd: bool) -> None:
+        share = tmp_path / "share"
+        (share / "odd_pkg" / "package.xml").mkdir(parents=True)
+        (share / "real_pkg").mkdir()
+        (share / "real_pkg" / "package.xml").write_text("<package><name>real_pkg</name></package>")
+
+        with mock.patch("rostree.core.finder._USE_DIR_FD", use_dir_fd):
+            assert _list_packages_in_install(tmp_path) == ["real_pkg"]
+
 
 class TestScanForWorkspaces:
     """Tests for scan_for_workspaces."""
@@ -301,10 +571,66 @@ class TestScanForWorkspaces:
         # Should only appear once
         assert len(result) == 1
 
+    def test_symlinked_workspace_reported_once(self, tmp_path: Path) -> None:
+        (tmp_path / "ws" / "src").mkdir(parents=True)
+        (tmp_path / "alias").symlink_to(tmp_path / "ws")
+
+        result = scan_for_workspaces(
+            roots=[tmp_path], max_depth=2, include_home=False, include_opt_ros=False
+        )
+        assert [ws.path for ws in result] == [(tmp_path / "ws").resolve()]
+
+    def test_each_candidate_listed_once(self, tmp_path: Path) -> None:
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / "ws" / "src").mkdir(parents=True)
+
+        with mock.patch("rostree.core.finder.os.scandir", wraps=os.scandir) as scandir:
+            scan_for_workspaces(
+                roots=[tmp_path], max_depth=3, include_home=False, include_opt_ros=False
+            )
+        listed = [str(c.args[0]) for c in scandir.call_args_list]
+        assert len(listed) == len(set(listed))
+        assert str(tmp_path / "a") in listed
+
+    def test_rescan_sees_nested_package_and_renamed_manifest(self, tmp_path: Path) -> None:
+        src = tmp_path / "ws" / "src"
+        (src / "group" / "a").mkdir(parents=True)
+        manifest = src / "group" / "a" / "package.xml"
+        manifest.write_text("<package><name>a</name></package>")
+        kwargs = dict(roots=[tmp_path], include_home=False, include_opt_ros=False)
+        assert scan_for_workspaces(**kwargs)[0].packages == ["a"]
+
+        (src / "group" / "b").mkdir()
+        (src / "group" / "b" / "package.xml").write_text("<package><name>b</name></package>")
+        assert sorted(scan_for_workspaces(**kwargs)[0].packages) == ["a", "b"]
+
+        manifest.write_text("<package><name>renamed</name></package>")
+        assert sorted(scan_for_workspaces(**kwargs)[0].packages) == ["b", "renamed"]
+
 
 class TestFindPackagePath:
     """Tests for find_package_path."""
 
+    def test_shared_prefix_probed_once(self, tmp_path: Path) -> None:
+        install = tmp_path / "install"
+        install.mkdir()
+
+        with mock.patch.dict(
+            os.environ,
+            {
+                "AMENT_PREFIX_PATH": str(install),
+                "COLCON_PREFIX_PATH": str(install),
+                "ROS2_WORKSPACE": "",
+                "COLCON_WORKSPACE": "",
+            },
+            clear=False,
+        ):
+            with mock.patch(
+                "rostree.core.finder._find_package_xml_in_prefix", return_value=None
+            ) as probe:
+                find_package_path("absent_pkg")
+        assert probe.call_count == 1
+
     def test_finds_in_extra_roots(self, tmp_path: Path) -> None:
         pkg_dir = tmp_path / "my_pkg"
         pkg_dir.mkdir()
@@ -339,6 +665,42 @@ class TestFindPackagePath:
             assert result is None
 
 
+class TestPackageResolver:
+    """Tests for package_resolver."""
+
+    def test_matches_find_package_path_and_indexes_once(self, tmp_path: Path) -> None:
+        install = tmp_path / "install"
+        (install / "share" / "inst_pkg").mkdir(parents=True)
+        (install / "share" / "inst_pkg" / "package.xml").write_text(
+            "<package><name>inst_pkg</name></package>"
+        )
+        src = tmp_path / "src"
+        for name in ("src_a", "src_b"):
+            (src / name).mkdir(parents=True)
+            (src / name / "package.xml").write_text(f"<package><name>{name}</name></package>")
+
+        with mock.patch.dict(
+            os.environ,
+            {
+                "AMENT_PREFIX_PATH": str(install),
+                "COLCON_PREFIX_PATH": "",
+                "ROS2_WORKSPACE": "",
+                "COLCON_WORKSPACE": "",
+            },
+            clear=False,
+        ):
+            names = ("inst_pkg", "src_a", "src_b", "missing")
+            expected = {n: find_package_path(n, extra_source_roots=[src]) for n in names}
+            with mock.patch(
+                "rostree.core.finder._package_names_in_trees",
+                wraps=rostree.core.finder._package_names_in_trees,
+            ) as index:
+                resolve = package_resolver([src])
+                assert {n: resolve(n) for n in names} == expected
+        assert expected["inst_pkg"] is not None and expected["missing"] is None
+        assert index.call_count == 1
+
+
 class TestListPackagePaths:
     """Tests for list_package_paths."""
 
@@ -366,6 +728,31 @@ class TestListPackagePaths:
 class TestListPackagesBySource:
     """Tests for list_packages_by_source."""
 
+    @pytest.mark.parametrize("func", [list_packages_by_source, list_package_paths])
+    def test_prefix_env_read_once(self, tmp_path: Path, func) -> None:
+        install = tmp_path / "ws" / "install"
+        install.mkdir(parents=True)
+        (tmp_path / "ws" / "src").mkdir()
+
+        with mock.patch.dict(
+            os.environ,
+            {
+                "AMENT_PREFIX_PATH": str(install),
+                "COLCON_PREFIX_PATH": str(install),
+                "ROS2_WORKSPACE": "",
+                "COLCON_WORKSPACE": "",
+            },
+            clear=False,
+        ):
+            with mock.patch(
+                "rostree.core.finder._env_paths", wraps=rostree.core.finder._env_paths
+            ) as env_paths:
+                func()
+        assert sorted(c.args[0] for c in env_paths.call_args_list) == [
+            "AMENT_PREFIX_PATH",
+            "COLCON_PREFIX_PATH",
+        ]
+
     def test_with_extra_roots(self, tmp_path: Path) -> None:
         pkg_dir = tmp_path / "added_pkg"
         pkg_dir.mkdir()
@@ -443,6 +830,30 @@ class TestListPackagesBySource:
                 all_pkgs.extend(pkgs)
             assert "my_installed_pkg" in all_pkgs
 
+    def test_concurrent_reads_are_order_independent(self, tmp_path: Path) -> None:
+        names = [f"pkg_{i:02d}" for i in range(8)]
+        # Create directories in reverse so walk order differs from sorted order
+        for name in reversed(names):
+            pkg_dir = tmp_path / name
+            pkg_dir.mkdir()
+            (pkg_dir / "package.xml").write_text(f"<package><name>{name}</name></package>")
+
+        with mock.patch.dict(
+            os.environ,
+            {
+                "AMENT_PREFIX_PATH": "",
+                "COLCON_PREFIX_PATH": "",
+                "ROS2_WORKSPACE": "",
+                "COLCON_WORKSPACE": "",
+            },
+            clear=False,
+        ):
+            result = list_packages_by_source(extra_source_roots=[tmp_path])
+            paths = list_package_paths(extra_source_roots=[tmp_path])
+        assert result[f"Added ({tmp_path.resolve()})"] == names
+        for name in names:
+            assert paths[name] == tmp_path.resolve() / name / "package.xml"
+
 
 class TestScanForWorkspacesAdvanced:
     """Additional tests for scan_for_workspaces edge cases."""
@@ -484,6 +895,22 @@ class TestScanForWorkspacesAdvanced:
         # Should not find the workspace in hidden directory
         assert len(result) == 0
 
+    def test_heavy_dirs_pruned(self, tmp_path: Path) -> None:
+        for name in ("node_modules", "log", "__pycache__"):
+            (tmp_path / name / "ws" / "src").mkdir(parents=True)
+        (tmp_path / "real_ws" / "src").mkdir(parents=True)
+
+        result = scan_for_workspaces(
+            roots=[tmp_path], max_depth=3, include_home=False, include_opt_ros=False
+        )
+        assert [ws.path.name for ws in result] == ["real_ws"]
+
+    def test_file_named_like_marker_is_not_workspace(self, tmp_path: Path) -> None:
+        (tmp_path / "src").write_text("not a directory")
+
+        result = scan_for_workspaces(roots=[tmp_path], include_home=False, include_opt_ros=False)
+        assert result == []
+
 
 class TestFindPackagePathAdvanced:
     """Additional tests for find_package_path."""
@@ -1,12 +1,20 @@
 """Tests for package.xml parser."""
 
+import os
+import xml.etree.ElementTree
 from pathlib import Path
+from unittest import mock
 
+import pytest
 
+import rostree.core.parser
 from rostree.core.parser import (
     parse_package_xml,
     PackageInfo,
     _is_ros_package_dependency,
+    _filter_ros_deps,
+    _LXML_ITERPARSE_OPTIONS,
+    clear_package_xml_cache,
 )
 
 
@@ -37,6 +45,15 @@ class TestIsRosPackageDependency:
         assert _is_ros_package_dependency("libboost-dev") is False
         assert _is_ros_package_dependency("libpng") is False
 
+    def test_python3_without_dash_is_kept(self) -> None:
+        assert _is_ros_package_dependency("python3_ros_helper") is True
+        assert _is_ros_package_dependency("python_qt_binding") is True
+
+    def test_filter_matches_predicate(self) -> None:
+        names = ["rclpy", "", "3rd", "python3", "python3-numpy", "libfoo", "std_msgs", "_x"]
+        assert _filter_ros_deps(names) == [n for n in names if _is_ros_package_dependency(n)]
+        assert _filter_ros_deps(names) == ["rclpy", "std_msgs"]
+
 
 class TestPackageInfo:
     """Tests for PackageInfo dataclass."""
@@ -53,6 +70,31 @@ class TestPackageInfo:
         assert info.dependencies == ["dep_a", "dep_b", "dep_c"]
 
 
+class TestXmlBackend:
+    """Tests for the XML parsing backend."""
+
+    def test_stdlib_backend_is_c_accelerated(self) -> None:
+        """The ElementTree fallback must be backed by the _elementtree C module."""
+        _elementtree = pytest.importorskip("_elementtree")
+        assert xml.etree.ElementTree.XMLParser is _elementtree.XMLParser
+        assert xml.etree.ElementTree.TreeBuilder is _elementtree.TreeBuilder
+
+
+@pytest.fixture(params=["lxml", "etree"])
+def xml_backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run parser tests against lxml (skipped when not installed) and stdlib ElementTree."""
+    if request.param == "lxml":
+        backend = pytest.importorskip("lxml.etree")
+        options = _LXML_ITERPARSE_OPTIONS
+    else:
+        backend = xml.etree.ElementTree
+        options = {}
+    monkeypatch.setattr("rostree.core.parser.ET", backend)
+    monkeypatch.setattr("rostree.core.parser._ITERPARSE_OPTIONS", options)
+    return request.param
+
+
+@pytest.mark.usefixtures("xml_backend")
 class TestParsePackageXml:
     """Tests for parse_package_xml function."""
 
@@ -246,3 +288,133 @@ class TestParsePackageXml:
         assert info.version == "2.0.0"
         assert info.description == "Whitespace test"
         assert "rclpy" in info.dependencies
+
+    def test_dependency_order_follows_tags(self, tmp_path: Path) -> None:
+        pkg = tmp_path / "package.xml"
+        pkg.write_text(
+            """<?xml version="1.0"?>
+<package format="3">
+  <name>order_pkg</name>
+  <version>1.0.0</version>
+  <description>Order <b>test</b></description>
+  <exec_depend>exec_dep</exec_depend>
+  <build_depend>build_dep</build_depend>
+  <depend>runtime_dep</depend>
+</package>
+"""
+        )
+        info = parse_package_xml(pkg)
+        assert info is not None
+        assert info.description == "Order"
+        assert info.dependencies == ["runtime_dep", "exec_dep", "build_dep"]
+
+    def test_fields_after_large_export_block(self, tmp_path: Path) -> None:
+        exports = "".join(f"<plugin index='{i}'><cfg>x</cfg></plugin>" for i in range(2000))
+        pkg = tmp_path / "package.xml"
+        pkg.write_text(
+            f"""<?xml version="1.0"?>
+<package format="3">
+  <name>export_pkg</name>
+  <export>{exports}</export>
+  <version>2.0.0</version>
+  <depend>after_export</depend>
+</package>
+"""
+        )
+        info = parse_package_xml(pkg)
+        assert info is not None
+        assert info.name == "export_pkg"
+        assert info.version == "2.0.0"
+        assert info.dependencies == ["after_export"]
+
+    def test_internal_entity_dependency(self, tmp_path: Path) -> None:
+        pkg = tmp_path / "package.xml"
+        pkg.write_text(
+            '<?xml version="1.0"?>\n'
+            '<!DOCTYPE package [<!ENTITY dep "rclcpp">]>\n'
+            "<package><name>entity_pkg</name><depend>&dep;</depend></package>\n"
+        )
+        info = parse_package_xml(pkg)
+        assert info is not None
+        assert info.dependencies == ["rclcpp"]
+
+    def test_names_are_shared_across_manifests(self, tmp_path: Path) -> None:
+        for name in ("pkg_a", "pkg_b"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "package.xml").write_text(
+                f"<package><name>{name}</name><version>1.0.0</version>"
+                "<depend>common_dep</depend></package>"
+            )
+        a = parse_package_xml(tmp_path / "pkg_a" / "package.xml")
+        b = parse_package_xml(tmp_path / "pkg_b" / "package.xml")
+        assert a is not None and b is not None
+        assert a.dependencies[0] is b.dependencies[0]
+        assert a.version is b.version
+
+
+class TestParsePackageXmlCache:
+    """Tests for the per-process parse_package_xml cache."""
+
+    def test_unchanged_file_is_parsed_once(self, tmp_path: Path) -> None:
+        pkg = tmp_path / "package.xml"
+        pkg.write_text("<package><name>cached_pkg</name></package>")
+        with mock.patch(
+            "rostree.core.parser._parse_package_xml_file",
+            wraps=rostree.core.parser._parse_package_xml_file,
+        ) as parse_file:
+            first = parse_package_xml(pkg)
+            assert first is not None
+            assert parse_package_xml(pkg) == first
+        assert parse_file.call_count == 1
+
+    def test_modified_file_is_reparsed(self, tmp_path: Path) -> None:
+        pkg = tmp_path / "package.xml"
+        pkg.write_text("<package><name>old_name</name></package>")
+        assert parse_package_xml(pkg).name == "old_name"
+        pkg.write_text("<package><name>new_name</name></package>")
+        st = os.stat(pkg)
+        os.utime(pkg, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert parse_package_xml(pkg).name == "new_name"
+
+    def test_include_tags_cached_separately(self, tmp_path: Path) -> None:
+        pkg = tmp_path / "package.xml"
+        pkg.write_text(
+            "<package><name>tags_pkg</name>"
+            "<depend>run_dep</depend><test_depend>test_dep</test_depend></package>"
+        )
+        assert parse_package_xml(pkg).dependencies == ["run_dep", "test_dep"]
+        assert parse_package_xml(pkg, include_tags=("depend",)).dependencies == ["run_dep"]
+
+    def test_same_mtime_different_size_is_reparsed(self, tmp_path: Path) -> None:
+        pkg = tmp_path / "package.xml"
+        pkg.write_text("<package><name>short</name></package>")
+        mtime = os.stat(pkg).st_mtime_ns
+        assert parse_package_xml(pkg).name == "short"
+        pkg.write_text("<package><name>much_longer_name</name></package>")
+        os.utime(pkg, ns=(mtime, mtime))
+        assert parse_package_xml(pkg).name == "much_longer_name"
+
+    def test_clear_cache(self, tmp_path: Path) -> None:
+        pkg = tmp_path / "package.xml"
+        pkg.write_text("<package><name>cached_pkg</name></package>")
+        first = parse_package_xml(pkg)
+        clear_package_xml_cache()
+        with mock.patch(
+            "rostree.core.parser._parse_package_xml_file",
+            wraps=rostree.core.parser._parse_package_xml_file,
+        ) as parse_file:
+            assert parse_package_xml(pkg) == first
+        assert parse_file.call_count == 1
+
+    def test_dependencies_not_shared_through_cache(self, tmp_path: Path) -> None:
+        pkg = tmp_path / "package.xml"
+        pkg.write_text("<package><name>cached_pkg</name><depend>rclpy</depend></package>")
+        parse_package_xml(pkg).dependencies.append("bogus")
+        assert parse_package_xml(pkg).dependencies == ["rclpy"]
+
+    def test_fields_not_shared_through_cache(self, tmp_path: Path) -> None:
+        pkg = tmp_path / "package.xml"
+        pkg.write_text("<package><name>cached_pkg</name></package>")
+        info = parse_package_xml(pkg)
+        info.name = "other"
+        assert parse_package_xml(pkg).name == "cached_pkg"
@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
-import os
+import sys
 from pathlib import Path
 from unittest import mock
 
+import pytest
 
+import rostree.core.finder
+from rostree.core.parser import PackageInfo, parse_package_xml
 from rostree.core.tree import DependencyNode, build_dependency_tree
 
+pytestmark = pytest.mark.usefixtures("clean_ros_env")
+
 
 class TestDependencyNode:
     """Tests for DependencyNode dataclass."""
@@ -27,6 +32,22 @@ class TestDependencyNode:
         assert node.children == []
         assert node.package_info is None
 
+    def test_to_dict_deeper_than_recursion_limit(self) -> None:
+        levels = sys.getrecursionlimit() + 100
+        node = DependencyNode(name="leaf", version="", description="", path="")
+        for i in range(levels):
+            node = DependencyNode(
+                name=f"n{i}", version="", description="", path="", children=[node]
+            )
+        d = node.to_dict()
+        for _ in range(levels):
+            d = d["children"][0]
+        assert d == {"name": "leaf", "version": "", "description": "", "path": "", "children": []}
+
+    def test_slotted(self) -> None:
+        node = DependencyNode(name="test_pkg", version="", description="", path="")
+        assert not hasattr(node, "__dict__")
+
     def test_to_dict_no_children(self) -> None:
         node = DependencyNode(
             name="pkg",
@@ -67,23 +88,13 @@ class TestBuildDependencyTree:
     """Tests for build_dependency_tree function."""
 
     def test_package_not_found(self, tmp_path: Path) -> None:
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = build_dependency_tree(
-                "nonexistent_pkg_xyz",
-                extra_source_roots=[tmp_path],
-            )
-            assert result is not None
-            assert result.name == "nonexistent_pkg_xyz"
-            assert result.description == "(not found)"
+        result = build_dependency_tree(
+            "nonexistent_pkg_xyz",
+            extra_source_roots=[tmp_path],
+        )
+        assert result is not None
+        assert result.name == "nonexistent_pkg_xyz"
+        assert result.description == "(not found)"
 
     def test_simple_package_no_deps(self, tmp_path: Path) -> None:
         # Create a simple package with no dependencies
@@ -99,25 +110,15 @@ class TestBuildDependencyTree:
 </package>
 """
         )
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = build_dependency_tree(
-                "simple_pkg",
-                extra_source_roots=[tmp_path],
-            )
-            assert result is not None
-            assert result.name == "simple_pkg"
-            assert result.version == "1.2.3"
-            assert result.description == "A simple package"
-            assert result.children == []
+        result = build_dependency_tree(
+            "simple_pkg",
+            extra_source_roots=[tmp_path],
+        )
+        assert result is not None
+        assert result.name == "simple_pkg"
+        assert result.version == "1.2.3"
+        assert result.description == "A simple package"
+        assert result.children == []
 
     def test_package_with_deps(self, tmp_path: Path) -> None:
         # Create parent package
@@ -145,25 +146,15 @@ class TestBuildDependencyTree:
 </package>
 """
         )
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = build_dependency_tree(
-                "parent_pkg",
-                extra_source_roots=[tmp_path],
-            )
-            assert result is not None
-            assert result.name == "parent_pkg"
-            assert len(result.children) == 1
-            assert result.children[0].name == "child_pkg"
-            assert result.children[0].version == "0.5.0"
+        result = build_dependency_tree(
+            "parent_pkg",
+            extra_source_roots=[tmp_path],
+        )
+        assert result is not None
+        assert result.name == "parent_pkg"
+        assert len(result.children) == 1
+        assert result.children[0].name == "child_pkg"
+        assert result.children[0].version == "0.5.0"
 
     def test_max_depth_zero(self, tmp_path: Path) -> None:
         pkg_dir = tmp_path / "pkg"
@@ -178,30 +169,20 @@ class TestBuildDependencyTree:
 </package>
 """
         )
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = build_dependency_tree(
-                "pkg",
-                max_depth=0,
-                extra_source_roots=[tmp_path],
-            )
-            # Root is at depth 0, so it should be returned
-            assert result is not None
-            assert result.name == "pkg"
-            # Children would be at depth 1, but max_depth=0 means they return None
-            # However, the child is still added but the recursion for grandchildren stops
-            # Actually, looking at the code: if _depth > max_depth, return None
-            # So at _depth=0, max_depth=0, 0 > 0 is False, so root is built
-            # Children are called with _depth=1, max_depth=0, 1 > 0 is True, return None
-            assert result.children == []
+        result = build_dependency_tree(
+            "pkg",
+            max_depth=0,
+            extra_source_roots=[tmp_path],
+        )
+        # Root is at depth 0, so it should be returned
+        assert result is not None
+        assert result.name == "pkg"
+        # Children would be at depth 1, but max_depth=0 means they return None
+        # However, the child is still added but the recursion for grandchildren stops
+        # Actually, looking at the code: if _depth > max_depth, return None
+        # So at _depth=0, max_depth=0, 0 > 0 is False, so root is built
+        # Children are called with _depth=1, max_depth=0, 1 > 0 is True, return None
+        assert result.children == []
 
     def test_max_depth_one(self, tmp_path: Path) -> None:
         # Create chain: pkg -> child -> grandchild
@@ -237,26 +218,16 @@ class TestBuildDependencyTree:
 </package>
 """
         )
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = build_dependency_tree(
-                "pkg",
-                max_depth=1,
-                extra_source_roots=[tmp_path],
-            )
-            assert result is not None
-            assert len(result.children) == 1
-            assert result.children[0].name == "child"
-            # Grandchild should not be included (depth 2 > max_depth 1)
-            assert result.children[0].children == []
+        result = build_dependency_tree(
+            "pkg",
+            max_depth=1,
+            extra_source_roots=[tmp_path],
+        )
+        assert result is not None
+        assert len(result.children) == 1
+        assert result.children[0].name == "child"
+        # Grandchild should not be included (depth 2 > max_depth 1)
+        assert result.children[0].children == []
 
     def test_cycle_detection(self, tmp_path: Path) -> None:
         # Create cycle: pkg_a -> pkg_b -> pkg_a
@@ -282,28 +253,79 @@ class TestBuildDependencyTree:
 </package>
 """
         )
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = build_dependency_tree(
-                "pkg_a",
-                extra_source_roots=[tmp_path],
+        result = build_dependency_tree(
+            "pkg_a",
+            extra_source_roots=[tmp_path],
+        )
+        assert result is not None
+        assert result.name == "pkg_a"
+        assert len(result.children) == 1
+        assert result.children[0].name == "pkg_b"
+        # pkg_b's dep on pkg_a should be marked as cycle
+        assert len(result.children[0].children) == 1
+        assert result.children[0].children[0].name == "pkg_a"
+        assert result.children[0].children[0].description == "(cycle)"
+
+    def test_parallel_root_expansion_keeps_order_and_diamonds(self, tmp_path: Path) -> None:
+        # root depends on dep_0..dep_9 (in that order); every dep_i depends on shared
+        names = [f"dep_{i}" for i in range(10)]
+
+        def write(name: str, deps: list[str]) -> None:
+            (tmp_path / name).mkdir()
+            depends = "".join(f"<depend>{d}</depend>" for d in deps)
+            (tmp_path / name / "package.xml").write_text(
+                f"<package><name>{name}</name><version>1.0</version>{depends}</package>"
             )
-            assert result is not None
-            assert result.name == "pkg_a"
-            assert len(result.children) == 1
-            assert result.children[0].name == "pkg_b"
-            # pkg_b's dep on pkg_a should be marked as cycle
-            assert len(result.children[0].children) == 1
-            assert result.children[0].children[0].name == "pkg_a"
-            assert result.children[0].children[0].description == "(cycle)"
+
+        write("root_pkg", names)
+        for name in names:
+            write(name, ["shared"])
+        write("shared", [])
+
+        result = build_dependency_tree("root_pkg", extra_source_roots=[tmp_path])
+        assert result is not None
+        assert [c.name for c in result.children] == names
+        for child in result.children:
+            # A diamond is not a cycle: each branch resolves shared on its own
+            assert [(g.name, g.version) for g in child.children] == [("shared", "1.0")]
+
+    def test_sibling_is_not_a_cycle(self, tmp_path: Path) -> None:
+        # top -> mid -> [b, c]; c -> b. b under c is a repeat, not an ancestor.
+        graph = {"top": ["mid"], "mid": ["b", "c"], "b": [], "c": ["b", "mid"]}
+        for name, deps in graph.items():
+            (tmp_path / name).mkdir()
+            depends = "".join(f"<depend>{d}</depend>" for d in deps)
+            (tmp_path / name / "package.xml").write_text(
+                f"<package><name>{name}</name>{depends}</package>"
+            )
+
+        result = build_dependency_tree("top", extra_source_roots=[tmp_path])
+        assert result is not None
+        c = result.children[0].children[1]
+        assert c.name == "c"
+        assert [(g.name, g.description) for g in c.children] == [
+            ("b", ""),
+            ("mid", "(cycle)"),
+        ]
+
+    def test_source_roots_indexed_once_per_build(self, tmp_path: Path) -> None:
+        for name, deps in (("top", ["mid_a", "mid_b"]), ("mid_a", ["leaf"]), ("mid_b", [])):
+            (tmp_path / name).mkdir()
+            depends = "".join(f"<depend>{d}</depend>" for d in deps)
+            (tmp_path / name / "package.xml").write_text(
+                f"<package><name>{name}</name>{depends}</package>"
+            )
+
+        with mock.patch(
+            "rostree.core.finder._package_names_in_trees",
+            wraps=rostree.core.finder._package_names_in_trees,
+        ) as index:
+            result = build_dependency_tree("top", extra_source_roots=[tmp_path])
+        assert index.call_count == 1
+        assert result is not None
+        assert [c.name for c in result.children] == ["mid_a", "mid_b"]
+        # leaf is missing: the index answers the miss without another walk
+        assert result.children[0].children[0].description == "(not found)"
 
     def test_runtime_only(self, tmp_path: Path) -> None:
         pkg_dir = tmp_path / "pkg"
@@ -321,53 +343,33 @@ class TestBuildDependencyTree:
 </package>
 """
         )
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            result = build_dependency_tree(
-                "pkg",
-                runtime_only=True,
-                extra_source_roots=[tmp_path],
-            )
-            assert result is not None
-            # Should only have runtime_dep and exec_dep (not build_dep or test_dep)
-            child_names = [c.name for c in result.children]
-            assert "runtime_dep" in child_names
-            assert "exec_dep" in child_names
-            assert "build_dep" not in child_names
-            assert "test_dep" not in child_names
+        result = build_dependency_tree(
+            "pkg",
+            runtime_only=True,
+            extra_source_roots=[tmp_path],
+        )
+        assert result is not None
+        # Should only have runtime_dep and exec_dep (not build_dep or test_dep)
+        child_names = [c.name for c in result.children]
+        assert "runtime_dep" in child_names
+        assert "exec_dep" in child_names
+        assert "build_dep" not in child_names
+        assert "test_dep" not in child_names
 
     def test_invalid_package_xml(self, tmp_path: Path) -> None:
         pkg_dir = tmp_path / "bad_pkg"
         pkg_dir.mkdir()
         (pkg_dir / "package.xml").write_text("not valid xml <<<")
 
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            # This will find the file but fail to parse it
-            # The finder finds based on name inside XML, so it won't find "bad_pkg"
-            result = build_dependency_tree(
-                "bad_pkg",
-                extra_source_roots=[tmp_path],
-            )
-            # Since finder can't match the name, it returns not found
-            assert result is not None
-            assert result.description == "(not found)"
+        # This will find the file but fail to parse it
+        # The finder finds based on name inside XML, so it won't find "bad_pkg"
+        result = build_dependency_tree(
+            "bad_pkg",
+            extra_source_roots=[tmp_path],
+        )
+        # Since finder can't match the name, it returns not found
+        assert result is not None
+        assert result.description == "(not found)"
 
     def test_parse_error_returns_node(self, tmp_path: Path) -> None:
         """Test that parse error returns a DependencyNode with (parse error) description."""
@@ -376,23 +378,33 @@ class TestBuildDependencyTree:
         pkg_xml = pkg_dir / "package.xml"
         pkg_xml.write_text("<package><name>parseerr_pkg</name></package>")
 
-        with mock.patch.dict(
-            os.environ,
-            {
-                "AMENT_PREFIX_PATH": "",
-                "COLCON_PREFIX_PATH": "",
-                "ROS2_WORKSPACE": "",
-                "COLCON_WORKSPACE": "",
-            },
-            clear=False,
-        ):
-            # Mock parse_package_xml to return None (simulate parse failure)
-            with mock.patch("rostree.core.tree.parse_package_xml", return_value=None):
-                result = build_dependency_tree(
-                    "parseerr_pkg",
-                    extra_source_roots=[tmp_path],
-                )
-                assert result is not None
-                assert result.name == "parseerr_pkg"
-                assert result.description == "(parse error)"
-                assert str(pkg_xml) in result.path
+        # Inject a parser that always fails (simulate parse failure)
+        result = build_dependency_tree(
+            "parseerr_pkg",
+            extra_source_roots=[tmp_path],
+            parser=lambda path, include_tags=None: None,
+        )
+        assert result is not None
+        assert result.name == "parseerr_pkg"
+        assert result.description == "(parse error)"
+        assert str(pkg_xml) in result.path
+
+    def test_parser_is_used_for_every_package(self, tmp_path: Path) -> None:
+        for name, dep in (("root_pkg", "<depend>leaf_pkg</depend>"), ("leaf_pkg", "")):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "package.xml").write_text(
+                f"<package><name>{name}</name>{dep}</package>"
+            )
+        seen: list[tuple[str, object]] = []
+
+        def parser(path: Path, include_tags: tuple[str, ...] | None = None) -> PackageInfo | None:
+            seen.append((Path(path).parent.name, include_tags))
+            return parse_package_xml(path, include_tags=include_tags)
+
+        result = build_dependency_tree(
+            "root_pkg", extra_source_roots=[tmp_path], runtime_only=True, parser=parser
+        )
+        assert result is not None
+        assert [c.name for c in result.children] == ["leaf_pkg"]
+        assert [name for name, _ in seen] == ["root_pkg", "leaf_pkg"]
+        assert all(tags == ("depend", "exec_depend") for _, tags in seen)
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import sys
 
 from rostree.tui.app import (
     _count_nodes,
     _node_stats,
+    _summarize,
 )
 
 
@@ -59,6 +61,14 @@ class TestCountNodes:
             current = child
         assert _count_nodes(node) == 5
 
+    def test_deeper_than_recursion_limit(self) -> None:
+        levels = sys.getrecursionlimit() + 100
+        node = MockNode("leaf")
+        for i in range(levels):
+            node = MockNode(f"level{i}", children=[node])
+        assert _count_nodes(node) == levels + 1
+        assert _node_stats(node) == (1, levels, levels)
+
 
 class TestNodeStats:
     """Tests for _node_stats helper."""
@@ -152,3 +162,21 @@ class TestNodeStats:
         assert direct == 0
         assert total == 0
         assert max_depth == 0
+
+
+class TestSummarize:
+    """Tests for _summarize helper."""
+
+    def test_matches_separate_helpers(self) -> None:
+        node = MockNode(
+            "root",
+            children=[
+                MockNode("a", children=[MockNode("a1"), MockNode("a2", children=[MockNode("x")])]),
+                MockNode("b"),
+            ],
+        )
+        assert _summarize(node) == (_count_nodes(node), *_node_stats(node))
+        assert _summarize(node) == (6, 2, 5, 3)
+
+    def test_leaf(self) -> None:
+        assert _summarize(MockNode("leaf")) == (1, 0, 0, 0)